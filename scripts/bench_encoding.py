@@ -0,0 +1,98 @@
+"""Measures the throughput of the OCR line encoding repair.
+
+Builds a synthetic stream of OCR lines (mostly clean Chinese, with GBK and
+UTF-8-as-cp1252 mojibake and Latin-1 text mixed in), then times the old
+unconditional latin-1 -> gbk round-trip against ``fix_lines`` and checks
+both against the expected output.
+
+    python scripts/bench_encoding.py --lines 5000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.utils.encoding_fix import RepairStats, fix_lines  # noqa: E402
+
+CLEAN_LINES = [
+    "姓名张三", "性别男民族汉", "出生1990年1月1日", "住址北京市朝阳区建国路88号",
+    "公民身份号码11010519900101123X", "中华人民共和国", "居民身份证",
+    "签发机关北京市公安局朝阳分局", "有效期限2015.01.01-2035.01.01",
+    "11010519900101123X", "2015.01.01-长期", "1990",
+]
+LATIN_LINES = ["Müller", "José García", "Ångström", "café crème"]
+
+
+def _as_cp1252(text):
+    """UTF-8 bytes shown as cp1252; undefined bytes keep their Latin-1 meaning."""
+    chars = []
+    for byte in text.encode('utf-8'):
+        try:
+            chars.append(bytes([byte]).decode('cp1252'))
+        except UnicodeDecodeError:
+            chars.append(chr(byte))
+    return "".join(chars)
+
+
+def make_lines(count, garbled_share, seed=0):
+    """Returns (lines, expected) with ``garbled_share`` of each mojibake kind."""
+    rng = random.Random(seed)
+    lines, expected = [], []
+    for _ in range(count):
+        roll = rng.random()
+        clean = rng.choice(CLEAN_LINES)
+        if roll < garbled_share:
+            lines.append(clean.encode('gbk').decode('latin-1'))
+        elif roll < 2 * garbled_share:
+            lines.append(_as_cp1252(clean))
+        elif roll < 3 * garbled_share:
+            clean = rng.choice(LATIN_LINES)
+            lines.append(clean)
+        else:
+            lines.append(clean)
+        expected.append(clean)
+    return lines, expected
+
+
+def old_fix(text):
+    try:
+        return text.encode('latin-1').decode('gbk')
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int, default=2_000_000)
+    parser.add_argument('--garbled-share', type=float, default=0.005,
+                        help='share of GBK, of UTF-8 and of Latin-1 lines each')
+    args = parser.parse_args()
+
+    lines, expected = make_lines(args.lines, args.garbled_share)
+    print(f"{len(lines):,} lines")
+
+    start = time.perf_counter()
+    old = [old_fix(line) for line in lines]
+    old_seconds = time.perf_counter() - start
+
+    stats = RepairStats()
+    start = time.perf_counter()
+    new = fix_lines(lines, stats)
+    new_seconds = time.perf_counter() - start
+
+    for name, output, seconds in (("round-trip", old, old_seconds),
+                                  ("fix_lines", new, new_seconds)):
+        wrong = sum(1 for got, want in zip(output, expected) if got != want)
+        print(f"{name:<11}{seconds:7.2f}s  {len(lines) / seconds / 1e6:6.2f}M lines/s  "
+              f"{wrong:,} wrong lines")
+    print(f"speedup    {old_seconds / new_seconds:.1f}x")
+    print(stats.summary())
+
+
+if __name__ == '__main__':
+    main()
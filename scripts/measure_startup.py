@@ -0,0 +1,84 @@
+"""Measures application start-up time.
+
+Launches the app (dev mode or the PyInstaller onedir build) several times and
+reports time-to-window and, when an image is given, time-to-first-result.
+
+    python scripts/measure_startup.py --runs 5 --image samples/A_1.jpg
+    python scripts/measure_startup.py --frozen --runs 5 --image samples/A_1.jpg
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Keep in sync with src/utils/startup_timer.py
+REPORT_ENV = "IDCARD_STARTUP_REPORT"
+IMAGE_ENV = "IDCARD_STARTUP_IMAGE"
+
+
+def app_command(frozen: bool):
+    if not frozen:
+        return [sys.executable, os.path.join(PROJECT_ROOT, 'src', '__main__.py')]
+    exe_name = 'IDCardOCRApp.exe' if platform.system() == 'Windows' else 'IDCardOCRApp'
+    return [os.path.join(PROJECT_ROOT, 'dist', 'IDCardOCRApp', exe_name)]
+
+
+def run_once(command, image, timeout):
+    """Runs the app once and returns {milestone: seconds since launch}."""
+    fd, report_path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    env = dict(os.environ)
+    env[REPORT_ENV] = report_path
+    if image:
+        env[IMAGE_ENV] = os.path.abspath(image)
+    else:
+        env.pop(IMAGE_ENV, None)
+
+    launched = time.time()
+    try:
+        subprocess.run(command, env=env, timeout=timeout, check=False,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        with open(report_path, encoding='utf-8') as f:
+            marks = json.load(f)
+    except (OSError, ValueError, subprocess.TimeoutExpired) as e:
+        print(f"  run failed: {e}")
+        return {}
+    finally:
+        os.remove(report_path)
+    return {name: mark['wall'] - launched for name, mark in marks.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frozen', action='store_true',
+                        help='measure dist/IDCardOCRApp instead of the dev entry point')
+    parser.add_argument('--image', help='image to recognize for time-to-first-result')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=300)
+    args = parser.parse_args()
+
+    command = app_command(args.frozen)
+    print(f"Measuring: {' '.join(command)}")
+    results = {}
+    for i in range(args.runs):
+        marks = run_once(command, args.image, args.timeout)
+        print(f"  run {i + 1}: " + ", ".join(
+            f"{name}={seconds:.2f}s" for name, seconds in sorted(marks.items())))
+        for name, seconds in marks.items():
+            results.setdefault(name, []).append(seconds)
+
+    print("Median over runs:")
+    for name in ('window_shown', 'engine_ready', 'first_result'):
+        if name in results:
+            print(f"  {name:<14}{statistics.median(results[name]):.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""Runs OCR across several processes or machines through a shared job queue.
+
+The coordinator groups the input files and stores one job per card in a
+SQLite queue; any number of headless workers on the same host pull jobs,
+recognize them and store the records. The queue uses SQLite's WAL mode, so
+its file must be on a local disk: WAL does not work on NFS/SMB shares.
+
+    python scripts/ocr_cluster.py coordinator --db queue.db --workers 4 \\
+        --output results.csv /archive/2024Q1
+    python scripts/ocr_cluster.py worker --db queue.db
+    python scripts/ocr_cluster.py status --db queue.db
+    python scripts/ocr_cluster.py export --db queue.db --output results.csv
+    python scripts/ocr_cluster.py query --db queue.db "addr:朝阳 expires:90"
+"""
+import argparse
+import logging
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.core.distributed import (  # noqa: E402
+    DEFAULT_LEASE_SECONDS,
+    DEFAULT_MAX_ATTEMPTS,
+    JobQueue,
+    enqueue_paths,
+    run_worker,
+    wait_for_completion,
+)
+from src.core.exporters import export_records  # noqa: E402
+from src.core.model_variants import MODEL_PRECISIONS  # noqa: E402
+from src.core.models import AppState  # noqa: E402
+
+
+def collect_inputs(inputs):
+    """Expands directories (recursively) into the files they contain."""
+    from src.core.scanner import scan_directories
+
+    files = [path for path in inputs if os.path.isfile(path)]
+    folders = [path for path in inputs if os.path.isdir(path)]
+    for batch in scan_directories(folders):
+        files.extend(batch)
+    return files
+
+
+def export_csv(queue, output):
+    """Writes all finished records to ``output`` (utf-8-sig, for Excel)."""
+    settings = AppState().column_settings
+    headers = [settings['custom_names'].get(key, key) for key in settings['order']]
+    records = list(queue.records())
+    export_records(records, output, settings['order'] + ['source_images'],
+                   headers + ['source_images'], fmt='csv')
+    print(f"Wrote {len(records)} records to {output}")
+
+
+def spawn_local_workers(args):
+    """Starts ``args.workers`` worker processes that share this host's cores."""
+    threads = max(1, (os.cpu_count() or 1) // args.workers)
+    command = [sys.executable, os.path.abspath(__file__), 'worker', '--db', args.db,
+               '--lease', str(args.lease), '--threads', str(threads),
+               '--precision', args.precision]
+    return [subprocess.Popen(command) for _ in range(args.workers)]
+
+
+def cmd_coordinator(args):
+    queue = JobQueue(args.db)
+    files = collect_inputs(args.inputs)
+    added = enqueue_paths(
+        queue, files, args.max_attempts, args.dpi, args.pages_per_card,
+        args.max_cards_per_sheet,
+    )
+    print(f"Found {len(files)} files; queued {added} new jobs.")
+
+    workers = spawn_local_workers(args) if args.workers else []
+    try:
+        progress = wait_for_completion(
+            queue, args.interval, lambda progress: print(progress.summary(), flush=True)
+        )
+    finally:
+        for process in workers:
+            process.wait()
+    if args.output:
+        export_csv(queue, args.output)
+    return 0 if progress.failed == 0 else 1
+
+
+def cmd_worker(args):
+    from src.core.ocr import set_engine_threads, set_model_precision
+
+    set_engine_threads(args.threads)
+    set_model_precision(args.precision)
+    queue = JobQueue(args.db)
+    run_worker(queue, args.worker_id, args.lease, exit_when_empty=not args.keep_running)
+    return 0
+
+
+def cmd_status(args):
+    progress = JobQueue(args.db).progress()
+    print(progress.summary())
+    for worker, done in sorted(progress.workers.items()):
+        print(f"  {worker}: {done}")
+    return 0
+
+
+def cmd_export(args):
+    export_csv(JobQueue(args.db), args.output)
+    return 0
+
+
+def cmd_query(args):
+    """Runs a filter-box query (see core/query.py) over the finished records."""
+    import time
+
+    from src.core.query import RecordIndex, parse_filter
+
+    records = list(JobQueue(args.db).records())
+    index = RecordIndex(records)
+    start = time.perf_counter()
+    rows = index.search(parse_filter(' '.join(args.filter)))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    for row in rows[:args.limit]:
+        record = records[row]
+        print('\t'.join([record.record_id, record.name, record.id_number,
+                         record.address, record.validity_period]))
+    print(f"{len(rows)} of {len(records)} records matched in {elapsed_ms:.1f} ms")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    coordinator = subparsers.add_parser('coordinator', help='queue inputs and wait')
+    coordinator.add_argument('inputs', nargs='+',
+                             help='image/document files or folders')
+    coordinator.add_argument('--db', required=True, help='queue database file')
+    coordinator.add_argument('--workers', type=int, default=0,
+                             help='worker processes to start on this host')
+    coordinator.add_argument('--output', help='CSV file for the results')
+    coordinator.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS)
+    coordinator.add_argument('--lease', type=float, default=DEFAULT_LEASE_SECONDS)
+    coordinator.add_argument('--precision', default='fp32', choices=MODEL_PRECISIONS,
+                             help='det/rec model precision of the local workers')
+    coordinator.add_argument('--dpi', type=int, help='PDF/TIFF rendering DPI')
+    coordinator.add_argument('--pages-per-card', type=int, default=1, choices=(1, 2))
+    coordinator.add_argument('--max-cards-per-sheet', type=int, default=4,
+                             help='split scans holding several cards (1 disables)')
+    coordinator.add_argument('--interval', type=float, default=5.0,
+                             help='seconds between progress reports')
+    coordinator.set_defaults(func=cmd_coordinator)
+
+    worker = subparsers.add_parser('worker', help='process jobs from the queue')
+    worker.add_argument('--db', required=True)
+    worker.add_argument('--worker-id', help='defaults to host:pid')
+    worker.add_argument('--lease', type=float, default=DEFAULT_LEASE_SECONDS)
+    worker.add_argument('--threads', type=int, help='onnxruntime threads per engine')
+    worker.add_argument('--precision', default='fp32', choices=MODEL_PRECISIONS,
+                        help='det/rec model precision (must have passed the gate)')
+    worker.add_argument('--keep-running', action='store_true',
+                        help='wait for new jobs instead of exiting when drained')
+    worker.set_defaults(func=cmd_worker)
+
+    status = subparsers.add_parser('status', help='show aggregated progress')
+    status.add_argument('--db', required=True)
+    status.set_defaults(func=cmd_status)
+
+    export = subparsers.add_parser('export', help='write finished records to CSV')
+    export.add_argument('--db', required=True)
+    export.add_argument('--output', required=True)
+    export.set_defaults(func=cmd_export)
+
+    query = subparsers.add_parser('query', help='search the finished records')
+    query.add_argument('filter', nargs='+', help='e.g. "张 age:30-40 expires:90"')
+    query.add_argument('--db', required=True)
+    query.add_argument('--limit', type=int, default=50, help='rows to print')
+    query.set_defaults(func=cmd_query)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(process)d %(levelname)s %(message)s')
+    sys.exit(args.func(args))
+
+
+if __name__ == '__main__':
+    main()
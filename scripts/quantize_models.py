@@ -0,0 +1,244 @@
+"""Builds INT8/FP16 det/rec models and accepts them only if accuracy holds.
+
+1. Runs the stock FP32 models over a calibration set of card images and
+   records the exact det/rec input tensors RapidOCR feeds them.
+2. INT8: static quantization (QDQ, per-channel weights) calibrated on those
+   tensors. FP16: weights and activations converted to float16.
+3. Accuracy gate: runs the FP32 and the new models over a labeled corpus
+   (see src/core/evaluation.py) and accepts the new models only if
+   extract_info's field accuracy stays within --max-drop of FP32, overall
+   and per field. Accepted models are recorded in models/quantized/accepted.json
+   and can then be selected in the app's OCR settings.
+
+    python scripts/quantize_models.py --calibration samples/calib \\
+        --corpus samples/labeled/corpus.jsonl --precision int8
+
+Needs the ``onnx`` package (and ``onnxconverter-common`` for FP16).
+"""
+import argparse
+import glob
+import os
+import sys
+from datetime import datetime
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.core.evaluation import accuracy_gate, evaluate_corpus, load_corpus  # noqa: E402
+from src.core.model_variants import (  # noqa: E402
+    ModelVariant,
+    quantized_model_dir,
+    save_variant,
+)
+from src.core.ocr import (  # noqa: E402
+    DEFAULT_PROFILE,
+    OCR_PROFILES,
+    acquire_engine,
+    register_profile,
+)
+from src.core.scanner import IMAGE_EXTENSIONS  # noqa: E402
+from src.utils.image_io import read_image  # noqa: E402
+
+
+class _InputRecorder:
+    """Wraps a RapidOCR inference session and keeps a copy of every input."""
+
+    def __init__(self, session, limit):
+        self._session = session
+        self.limit = limit
+        self.inputs = []
+
+    def __call__(self, input_content):
+        if len(self.inputs) < self.limit:
+            self.inputs.append(input_content.copy())
+        return self._session(input_content)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+def _model_file(task_cfg):
+    """The ONNX file RapidOCR loads for its Det/Rec config: the configured
+    ``model_path``, or the default model it downloads to ``model_root_dir``."""
+    from rapidocr.inference_engine.base import FileInfo, InferSession
+
+    if task_cfg.get('model_path'):
+        return str(task_cfg.model_path)
+    model_info = InferSession.get_model_url(FileInfo(
+        engine_type=task_cfg.engine_type,
+        ocr_version=task_cfg.ocr_version,
+        task_type=task_cfg.task_type,
+        lang_type=task_cfg.lang_type,
+        model_type=task_cfg.model_type,
+    ))
+    return os.path.join(
+        str(task_cfg.model_root_dir), os.path.basename(model_info['model_dir'])
+    )
+
+
+def collect_calibration(image_dir, limit):
+    """Returns (det_path, rec_path, det_inputs, rec_inputs) for FP32 models."""
+    import numpy as np
+
+    paths = sorted(
+        p for p in glob.glob(os.path.join(image_dir, '**', '*'), recursive=True)
+        if p.lower().endswith(IMAGE_EXTENSIONS)
+    )[:limit]
+    if not paths:
+        raise SystemExit(f"No calibration images found in {image_dir}")
+
+    with acquire_engine(DEFAULT_PROFILE) as engine:
+        # RapidOCR creates its det/rec models on first use. Load both now so
+        # their sessions are wrapped before the first calibration image.
+        blank = np.full((48, 320, 3), 255, dtype=np.uint8)
+        engine(blank, use_det=True, use_cls=False, use_rec=False)
+        engine(blank, use_det=False, use_cls=False, use_rec=True)
+        det = engine.text_det.session = _InputRecorder(engine.text_det.session, limit)
+        rec = engine.text_rec.session = _InputRecorder(
+            engine.text_rec.session, limit * 4)
+        try:
+            for path in paths:
+                image = read_image(path)
+                if image is not None:
+                    engine(image, use_det=True, use_cls=True, use_rec=True)
+        finally:
+            # Restore the plain sessions on the pooled engine.
+            engine.text_det.session = det._session
+            engine.text_rec.session = rec._session
+        if not det.inputs or not rec.inputs:
+            raise SystemExit("Calibration images produced no detected text.")
+        det_path = _model_file(engine.cfg.Det)
+        rec_path = _model_file(engine.cfg.Rec)
+    print(f"Calibration: {len(det.inputs)} det and {len(rec.inputs)} rec inputs "
+          f"from {len(paths)} images")
+    return det_path, rec_path, det.inputs, rec.inputs
+
+
+def _copy_metadata(source_path, target_path):
+    """Keeps custom metadata (e.g. the rec model's character list)."""
+    import onnx
+
+    source = onnx.load(source_path, load_external_data=False)
+    target = onnx.load(target_path)
+    existing = {prop.key for prop in target.metadata_props}
+    for prop in source.metadata_props:
+        if prop.key not in existing:
+            target.metadata_props.append(prop)
+    onnx.save(target, target_path)
+
+
+def quantize_int8(source_path, target_path, inputs):
+    import onnxruntime
+    from onnxruntime.quantization import (
+        CalibrationDataReader,
+        QuantFormat,
+        QuantType,
+        quantize_static,
+    )
+
+    input_name = onnxruntime.InferenceSession(
+        source_path, providers=['CPUExecutionProvider']
+    ).get_inputs()[0].name
+
+    class Reader(CalibrationDataReader):
+        def __init__(self):
+            self._items = iter(inputs)
+
+        def get_next(self):
+            item = next(self._items, None)
+            return None if item is None else {input_name: item}
+
+    quantize_static(
+        source_path, target_path, Reader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+    )
+    _copy_metadata(source_path, target_path)
+
+
+def convert_fp16(source_path, target_path):
+    import onnx
+    from onnxconverter_common import float16
+
+    model = float16.convert_float_to_float16(
+        onnx.load(source_path), keep_io_types=True
+    )
+    onnx.save(model, target_path)
+    _copy_metadata(source_path, target_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calibration', required=True,
+                        help='folder of card images used for INT8 calibration')
+    parser.add_argument('--corpus', required=True,
+                        help='labeled corpus manifest (JSON Lines) for the gate')
+    parser.add_argument('--precision', choices=('int8', 'fp16'), default='int8')
+    parser.add_argument('--max-drop', type=float, default=0.01,
+                        help='allowed field accuracy drop vs FP32 (0.01 = 1 point)')
+    parser.add_argument('--calibration-limit', type=int, default=200,
+                        help='images used for calibration')
+    parser.add_argument('--output-dir', default=quantized_model_dir())
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    det_path, rec_path, det_inputs, rec_inputs = collect_calibration(
+        args.calibration, args.calibration_limit
+    )
+
+    targets = {}
+    for kind, source, inputs in (('det', det_path, det_inputs),
+                                 ('rec', rec_path, rec_inputs)):
+        stem = os.path.splitext(os.path.basename(source))[0]
+        target = os.path.join(args.output_dir, f"{stem}_{args.precision}.onnx")
+        print(f"Converting {source} -> {target}")
+        if args.precision == 'int8':
+            quantize_int8(source, target, inputs)
+        else:
+            convert_fp16(source, target)
+        targets[kind] = target
+
+    # Both model sets run side by side as separate profiles.
+    samples = load_corpus(args.corpus)
+    fast_params = OCR_PROFILES[DEFAULT_PROFILE]
+    register_profile('gate-fp32', {
+        **fast_params, 'Det.model_path': det_path, 'Rec.model_path': rec_path,
+    })
+    register_profile('gate-candidate', {
+        **fast_params,
+        'Det.model_path': targets['det'], 'Rec.model_path': targets['rec'],
+    })
+    baseline = evaluate_corpus(samples, 'gate-fp32')
+    candidate = evaluate_corpus(samples, 'gate-candidate')
+    speedup = baseline.seconds / candidate.seconds if candidate.seconds else 0.0
+
+    passed, report = accuracy_gate(baseline.scores, candidate.scores, args.max_drop)
+    print(f"Field accuracy on {len(samples)} labeled cards (FP32 -> {args.precision}):")
+    for line in report:
+        print(f"  {line}")
+    print(f"Speed: {baseline.seconds:.1f}s -> {candidate.seconds:.1f}s "
+          f"({speedup:.2f}x)")
+
+    if not passed:
+        for path in targets.values():
+            os.remove(path)
+        print(f"Rejected: accuracy dropped by more than {args.max_drop:.1%}.")
+        sys.exit(1)
+
+    save_variant(ModelVariant(
+        precision=args.precision,
+        det_path=os.path.relpath(targets['det'], args.output_dir),
+        rec_path=os.path.relpath(targets['rec'], args.output_dir),
+        baseline_accuracy=baseline.scores.accuracy(),
+        accuracy=candidate.scores.accuracy(),
+        speedup=speedup,
+        accepted_at=datetime.now().isoformat(timespec='seconds'),
+    ), args.output_dir)
+    print(f"Accepted {args.precision} models; select them in 识别设置.")
+
+
+if __name__ == '__main__':
+    main()
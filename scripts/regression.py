@@ -0,0 +1,129 @@
+"""Checks extraction accuracy and speed against a labeled golden corpus.
+
+The corpus is a JSON Lines manifest (see src/core/evaluation.py) of card
+images with their expected fields. ``capture`` runs OCR once and stores
+each card's OCR output as a fixture; ``replay`` then re-runs only the
+extraction (extract_info, parse_validity_period, fix_garbled_text, ...) on
+those fixtures, so extraction changes are checked in seconds without any
+inference. ``run`` goes through the full OCR pipeline to catch changes in
+the OCR configuration.
+
+    python scripts/regression.py capture --corpus golden/corpus.jsonl
+    python scripts/regression.py replay --corpus golden/corpus.jsonl \\
+        --save-baseline golden/replay_baseline.json
+    python scripts/regression.py replay --corpus golden/corpus.jsonl \\
+        --baseline golden/replay_baseline.json
+
+Exits with status 1 when a baseline is given and the run regressed.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.core.evaluation import (  # noqa: E402
+    CorpusResult,
+    capture_fixtures,
+    evaluate_corpus,
+    format_result,
+    load_corpus,
+    regression_check,
+    replay_corpus,
+    save_corpus,
+)
+from src.utils.encoding_fix import repair_stats  # noqa: E402
+
+
+def report(result, args):
+    """Prints the result, then saves it and/or checks it against a baseline."""
+    for line in format_result(result):
+        print(line)
+    print(f"Encoding repair: {repair_stats.summary()}")
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(result.to_dict(), f, ensure_ascii=False, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = CorpusResult.from_dict(json.load(f))
+    if baseline.samples != result.samples:
+        print(f"Baseline has {baseline.samples} records, this run "
+              f"{result.samples}; was the corpus changed?")
+        return 1
+    passed, lines = regression_check(
+        baseline, result, args.max_drop, args.max_slowdown
+    )
+    print(f"Against {args.baseline}:")
+    for line in lines:
+        print(f"  {line}")
+    print("PASSED" if passed else "REGRESSED")
+    return 0 if passed else 1
+
+
+def cmd_capture(args):
+    samples = load_corpus(args.corpus)
+    fixture_dir = args.fixture_dir or os.path.join(
+        os.path.dirname(os.path.abspath(args.corpus)), 'fixtures'
+    )
+    capture_fixtures(samples, fixture_dir, args.profile)
+    save_corpus(samples, args.output or args.corpus)
+    print(f"Stored OCR fixtures of {len(samples)} cards in {fixture_dir}")
+    return 0
+
+
+def cmd_replay(args):
+    return report(replay_corpus(load_corpus(args.corpus)), args)
+
+
+def cmd_run(args):
+    samples = load_corpus(args.corpus)
+    return report(evaluate_corpus(samples, args.profile, args.template), args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    capture = subparsers.add_parser('capture', help='store OCR output as fixtures')
+    capture.add_argument('--corpus', required=True, help='labeled corpus manifest')
+    capture.add_argument('--fixture-dir',
+                         help='defaults to fixtures/ next to the manifest')
+    capture.add_argument('--output',
+                         help='manifest to write (defaults to updating --corpus)')
+    capture.add_argument('--profile',
+                         help='store one OCR profile\'s output instead of the '
+                              'tiered pipeline\'s')
+    capture.set_defaults(func=cmd_capture)
+
+    replay = subparsers.add_parser('replay', help='extraction only, from fixtures')
+    run = subparsers.add_parser('run', help='full OCR pipeline on the images')
+    run.add_argument('--profile',
+                     help='run only this OCR profile (default: tiered pipeline)')
+    run.add_argument('--template', action='store_true',
+                     help='use template mode like the app does')
+    replay.set_defaults(func=cmd_replay)
+    run.set_defaults(func=cmd_run)
+    for sub in (replay, run):
+        sub.add_argument('--corpus', required=True, help='labeled corpus manifest')
+        sub.add_argument('--baseline', help='result JSON to compare against')
+        sub.add_argument('--save-baseline', help='write this run\'s result JSON')
+        sub.add_argument('--max-drop', type=float, default=0.005,
+                         help='allowed precision/recall/SUCCESS-rate drop '
+                              '(0.005 = half a point)')
+        sub.add_argument('--max-slowdown', type=float, default=0.25,
+                         help='allowed records/s drop as a fraction of baseline')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR,
+                        format='%(asctime)s %(levelname)s %(message)s')
+    sys.exit(args.func(args))
+
+
+if __name__ == '__main__':
+    main()
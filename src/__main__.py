@@ -11,15 +11,9 @@ if getattr(sys, 'frozen', False):
     # Set HF_HOME to point to the bundled models directory
     os.environ['HF_HOME'] = os.path.join(application_path, 'models')
     logging.info(f"HF_HOME set to: {os.environ['HF_HOME']}")
-
-    # Debugging path resolution
-    import rapidocr
+    # rapidocr is no longer imported here; the OCR module logs its
+    # location when the engine is first created.
     logging.info(f"sys._MEIPASS: {sys._MEIPASS}")
-    logging.info(f"rapidocr.__file__: {rapidocr.__file__}")
-    logging.info(f"os.path.dirname(rapidocr.__file__): {os.path.dirname(rapidocr.__file__)}")
-    # Assuming rapidocr is directly under _MEIPASS
-    rapidocr_root_in_bundle = os.path.abspath(os.path.join(os.path.dirname(rapidocr.__file__), '..', '..'))
-    logging.info(f"rapidocr_root_in_bundle: {rapidocr_root_in_bundle}")
     logging.info(f"Current Working Directory: {os.getcwd()}")
 else:
     # Running as a normal .py script, so find the project root
@@ -27,9 +21,14 @@ else:
     if project_root not in sys.path:
         sys.path.insert(0, project_root)
 
-from src.app.main_window import MainWindow
+# Imported first so its clock starts before the heavier imports below.
+from src.utils import startup_timer  # noqa: I001
+
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import QApplication
 
+from src.app.main_window import MainWindow
+
 # Configure logging for the entire application (more robust)
 
 # Clear existing handlers from the root logger
@@ -48,7 +47,25 @@ def main():
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
-    sys.exit(app.exec())
+    # Fires on the first event-loop turn, i.e. once the window is on screen.
+    QTimer.singleShot(0, lambda: startup_timer.mark("window_shown"))
+
+    # Startup measurement mode (see scripts/measure_startup.py): optionally
+    # recognize one image, then quit once the last milestone is reached.
+    if os.environ.get(startup_timer.REPORT_ENV):
+        profile_image = os.environ.get(startup_timer.IMAGE_ENV)
+        worker = None
+        if profile_image:
+            window.add_files_to_list([profile_image])
+            worker = window.start_ocr()
+        if worker is not None:
+            worker.finished.connect(lambda _: QTimer.singleShot(0, app.quit))
+        else:
+            QTimer.singleShot(0, app.quit)
+
+    exit_code = app.exec()
+    window.warmup_thread.wait()
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,56 @@
+import os
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+
+class FileListModel(QAbstractListModel):
+    """A list model holding the files queued for recognition.
+
+    Membership is tracked in a set so adding a batch is O(batch size), and
+    rows are inserted once per batch instead of once per file.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._files = []
+        self._file_set = set()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._files)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole or role == Qt.ToolTipRole:
+            return self._files[index.row()]
+        return None
+
+    def files(self):
+        return self._files
+
+    def add_files(self, paths):
+        """Append paths that are not already listed; returns how many were added."""
+        new_files = []
+        for path in paths:
+            # Dialogs and directory scans may spell the same path differently.
+            path = os.path.normpath(path)
+            if path not in self._file_set:
+                self._file_set.add(path)
+                new_files.append(path)
+        if new_files:
+            first = len(self._files)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_files) - 1)
+            self._files.extend(new_files)
+            self.endInsertRows()
+        return len(new_files)
+
+    def remove_rows(self, rows):
+        """Remove the given row numbers."""
+        rows = set(rows)
+        if not rows:
+            return
+        self.beginResetModel()
+        self._files = [f for i, f in enumerate(self._files) if i not in rows]
+        self._file_set = set(self._files)
+        self.endResetModel()
@@ -1,14 +1,17 @@
 import logging
 import os
+import time
 
-from PySide6.QtCore import Qt, QThread, Signal, QSettings
+from PySide6.QtCore import QFileSystemWatcher, QSettings, Qt, QThread, QTimer, Signal
 from PySide6.QtGui import QAction
 from PySide6.QtWidgets import (
+    QAbstractItemView,
     QApplication,
     QFileDialog,
     QHBoxLayout,
     QInputDialog,
-    QListWidget,
+    QLineEdit,
+    QListView,
     QMainWindow,
     QMenu,
     QProgressBar,
@@ -21,15 +24,64 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from ..core.documents import DEFAULT_DPI
+from ..core.exporters import RowSerializer, column_headers, export_records
+from ..core.grouping import group_sources
+from ..core.hot_folder import HotFolderIngestor, HotFolderService, RollingCSVWriter
+from ..core.model_variants import DEFAULT_PRECISION, available_precisions
+from ..core.models import AppState
+from ..core.ocr import set_model_precision, warm_up_engine
+from ..core.query import RecordIndex, parse_filter
+from ..core.raw_store import (
+    DEFAULT_RAW_OUTPUT_POLICY,
+    RAW_OUTPUT_STORE,
+    RAW_OUTPUT_SUMMARY,
+    RawOCRStore,
+)
+from ..core.scanner import scan_directories
+from ..core.scheduler import LANE_BULK, LANE_INTERACTIVE, JobScheduler
+from ..utils import startup_timer
+from ..utils.encoding_fix import repair_stats
+from .file_list_model import FileListModel
+from .record_detail_dialog import RecordDetailDialog
 from .table_model import RecordTableModel
-from ..core.excel_export import export_to_excel
-from ..core.grouping import group_images
-from ..core.models import AppState, IDCardRecord
-from ..core.ocr import extract_info, ocr_image
+
+# Each parallel worker holds its own engine, so keep the default modest.
+DEFAULT_MAX_WORKERS = max(1, min(4, (os.cpu_count() or 1) // 2))
+
+
+class EngineWarmupThread(QThread):
+    """Loads the OCR engine in the background while the user picks files."""
+    warmed_up = Signal()
+    failed = Signal(str)
+
+    def run(self):
+        try:
+            warm_up_engine()
+        except Exception as e:
+            logging.error(f"OCR engine warm-up failed: {e}", exc_info=True)
+            self.failed.emit(str(e))
+            return
+        startup_timer.mark("engine_ready")
+        self.warmed_up.emit()
+
+
+class IndexBuildThread(QThread):
+    """Builds the query index over the result records in the background."""
+    built = Signal(object)
+
+    def __init__(self, records, parent=None):
+        super().__init__(parent)
+        self.source = records
+        # Records are only ever appended, so a snapshot keeps positions valid.
+        self.records = list(records)
+
+    def run(self):
+        self.built.emit(RecordIndex(self.records))
 
 
 class Worker(QThread):
-    """Worker thread for long-running OCR tasks."""
+    """Groups the images of one OCR job and runs it on the job scheduler."""
     finished = Signal(object)
     progress = Signal(int)
     grouping_started = Signal(int)
@@ -37,105 +89,158 @@ class Worker(QThread):
     ocr_started = Signal(str)
     ocr_finished = Signal(str, str)
     ocr_error = Signal(str, str)
-
-    def __init__(self, image_paths):
+    record_ready = Signal(object)
+    tier_summary = Signal(str)
+
+    def __init__(
+        self, scheduler, image_paths, lane=LANE_BULK, audit_every=0,
+        dpi=DEFAULT_DPI, pages_per_card=1, max_cards_per_sheet=4,
+        raw_store=None,
+    ):
         super().__init__()
+        self.scheduler = scheduler
         self.image_paths = image_paths
+        self.lane = lane
+        self.audit_every = audit_every
+        self.dpi = dpi
+        self.pages_per_card = pages_per_card
+        self.max_cards_per_sheet = max_cards_per_sheet
+        self.raw_store = raw_store
+        self.job = None
         self._is_stopped = False
 
     def stop(self):
         self._is_stopped = True
+        if self.job:
+            self.scheduler.cancel(self.job)
 
     def run(self):
-        """Group images, perform OCR, and extract info."""
+        """Group images, then queue them and wait for the scheduler."""
         app_state = AppState()
 
         self.grouping_started.emit(len(self.image_paths))
-        image_groups = group_images(self.image_paths)
+        image_groups = group_sources(
+            self.image_paths, self.dpi, self.pages_per_card, self.max_cards_per_sheet
+        )
         self.grouping_finished.emit(len(image_groups))
+        if self._is_stopped:
+            self.finished.emit(app_state)
+            return
 
-        total_groups = len(image_groups)
+        self.job = self.scheduler.submit(
+            image_groups, self.lane,
+            on_start=lambda group: self.ocr_started.emit(group.group_id),
+            on_result=self._on_result,
+            audit_every=self.audit_every,
+            raw_store=self.raw_store,
+        )
+        if self._is_stopped:
+            self.scheduler.cancel(self.job)
+        self.job.wait()
 
-        for i, group in enumerate(image_groups):
-            if self._is_stopped:
-                break
+        app_state.records = sorted(
+            self.job.records, key=lambda record: int(record.record_id)
+        )
+        logging.info(f"Tiered OCR: {self.job.stats.summary()}")
+        logging.info(f"Encoding repair: {repair_stats.summary()}")
+        self.tier_summary.emit(self.job.stats.summary())
+        self.finished.emit(app_state)
 
-            self.ocr_started.emit(group.group_id)
-            all_ocr_results = []
-            record_status = "SUCCESS"
-            error_msg = ""
-
-            try:
-                for image_path in group.image_paths:
-                    if self._is_stopped:
-                        break
-                    ocr_result = ocr_image(image_path) # ocr_result is a DoclingDocument
-                    if ocr_result:
-                        all_ocr_results.append(ocr_result) # Change extend to append
-            except Exception as e:
-                record_status = "FAILED"
-                error_msg = str(e)
-                self.ocr_error.emit(group.group_id, error_msg)
-
-            if self._is_stopped:
-                break
+    def _on_result(self, job, index, group, record, record_status, error_msg):
+        # Called from a scheduler thread; signals are queued to the UI.
+        if error_msg:
+            self.ocr_error.emit(group.group_id, error_msg)
+        self.record_ready.emit(record)
+        self.ocr_finished.emit(group.group_id, record_status)
+        self.progress.emit(job.percent())
 
-            if all_ocr_results and record_status == "SUCCESS":
-                # Create a single record for the group to merge info into.
-                record = IDCardRecord(record_id=str(i + 1))
-                try:
-                    # Loop through results from all images (front and back)
-                    # and update the same record.
-                    for ocr_result in all_ocr_results:
-                        record = extract_info(ocr_result, record=record)
-
-                except Exception as e:
-                    logging.error(f"Failed to extract info for group {group.group_id}: {e}", exc_info=True)
-                    try:
-                        # Log a concise summary of all OCR results in the group
-                        for i, ocr_res in enumerate(all_ocr_results):
-                            log_str = (
-                                f"Problematic OCR data (Image {i+1}) - "
-                                f"txts: {getattr(ocr_res, 'txts', 'N/A')}, "
-                                f"scores: {getattr(ocr_res, 'scores', 'N/A')}"
-                            )
-                            logging.error(log_str)
-                    except Exception as log_e:
-                        logging.error(f"Could not log concise OCR data: {log_e}")
-
-                    record_status = "FAILED"
-                    error_msg = f"Info extraction failed: {e}"
-                    record.status = "FAILED"
-                    record.raw_ocr_output = error_msg
-
-                # Final validation and appending the record
-                if record_status == "SUCCESS" and (not record.name or not record.id_number):
-                    record.status = "FAILED"
-                    record_status = "FAILED"
-
-                record.source_images = group.image_paths
-                if not record.raw_ocr_output:
-                    try:
-                        # Store a summary if no specific error was recorded
-                        record.raw_ocr_output = f"{len(all_ocr_results)} images processed."
-                    except Exception:
-                        record.raw_ocr_output = "Could not represent OCR data."
-                app_state.records.append(record)
-            else:
-                # Create a failed record if OCR returns nothing or an error occurred
-                record = IDCardRecord(
-                    record_id=str(i + 1),
-                    source_images=group.image_paths,
-                    status="FAILED",
-                    raw_ocr_output=error_msg
-                )
-                app_state.records.append(record)
-                record_status = "FAILED"
+class ScanWorker(QThread):
+    """Worker thread that scans folders recursively and reports files in batches."""
+    batch_found = Signal(list)
+    scan_finished = Signal(int)
 
-            self.ocr_finished.emit(group.group_id, record_status)
-            self.progress.emit(int(((i + 1) / total_groups) * 100))
+    def __init__(self, folders, options=None):
+        super().__init__()
+        self.folders = folders
+        self.options = options
+        self._is_stopped = False
+
+    def stop(self):
+        self._is_stopped = True
+
+    def run(self):
+        total = 0
+        for batch in scan_directories(
+            self.folders, self.options, lambda: self._is_stopped
+        ):
+            total += len(batch)
+            self.batch_found.emit(batch)
+        self.scan_finished.emit(total)
+
+
+class HotFolderWorker(QThread):
+    """Worker thread that watches folders and recognizes images as they arrive."""
+    record_ready = Signal(object)
+
+    def __init__(self, directories, output_dir, raw_store=None):
+        super().__init__()
+        # With a file system watcher feeding notify(), full rescans are only
+        # a safety net, so they can be infrequent.
+        writer = RollingCSVWriter(output_dir)
+        self.service = HotFolderService(
+            HotFolderIngestor(directories, ingested=writer.ingested_paths()),
+            writer,
+            full_scan_interval=30.0,
+            raw_store=raw_store,
+        )
+        self._is_stopped = False
+
+    def stop(self):
+        self._is_stopped = True
+        self.service.notify()
+
+    def run(self):
+        self.service.run(lambda: self._is_stopped, self.record_ready.emit)
+        logging.info(f"Hot folder stopped. Tiered OCR: {self.service.stats.summary()}")
+
+
+class ExportWorker(QThread):
+    """Writes records to an xlsx/csv file in the background."""
+    progress = Signal(int)
+    exported = Signal(str)
+    cancelled = Signal()
+    failed = Signal(str)
+
+    def __init__(self, records, path, column_keys, headers, parent=None):
+        super().__init__(parent)
+        # Snapshot: the table may still receive records during the export.
+        self.records = list(records)
+        self.path = path
+        self.column_keys = column_keys
+        self.headers = headers
+        self._is_stopped = False
+
+    def stop(self):
+        self._is_stopped = True
+
+    def run(self):
+        try:
+            completed = export_records(
+                self.records, self.path, self.column_keys, self.headers,
+                on_progress=lambda done, total: self.progress.emit(
+                    int(done * 100 / total) if total else 100
+                ),
+                should_stop=lambda: self._is_stopped,
+            )
+        except Exception as e:
+            logging.error(f"Export to {self.path} failed: {e}", exc_info=True)
+            self.failed.emit(str(e))
+            return
+        if completed:
+            self.exported.emit(self.path)
+        else:
+            self.cancelled.emit()
 
-        self.finished.emit(app_state)
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -153,8 +258,20 @@ class MainWindow(QMainWindow):
 
         # App State
         self.app_state = AppState()
-        self.selected_files = []
-        self.worker = None
+        self.file_list_model = FileListModel(self)
+        self.scan_worker = None
+        # One Worker per queued OCR job; all of them share the scheduler.
+        self.workers = []
+        self.scheduler = None
+        self.export_worker = None
+        self.hot_folder_worker = None
+        self.folder_watcher = None
+        self.raw_store = None
+        # Hot-folder records are numbered separately, so their raw output
+        # goes to a store of its own.
+        self.hot_folder_raw_store = None
+        self.record_index = None
+        self.index_thread = None
 
         # Tool Bar (Menu Bar removed)
         self.tool_bar = QToolBar("Main Tool Bar")
@@ -175,13 +292,26 @@ class MainWindow(QMainWindow):
         start_ocr_action.triggered.connect(self.start_ocr)
         self.tool_bar.addAction(start_ocr_action)
 
+        urgent_ocr_action = QAction("加急识别", self)
+        urgent_ocr_action.setToolTip("优先识别选中的文件，不必等待正在进行的批量任务")
+        urgent_ocr_action.triggered.connect(self.start_urgent_ocr)
+        self.tool_bar.addAction(urgent_ocr_action)
+
         stop_ocr_action = QAction("停止识别", self)
         stop_ocr_action.triggered.connect(self.stop_ocr)
         self.tool_bar.addAction(stop_ocr_action)
 
+        self.hot_folder_action = QAction("监控文件夹", self, checkable=True)
+        self.hot_folder_action.toggled.connect(self.toggle_hot_folder)
+        self.tool_bar.addAction(self.hot_folder_action)
+
+        settings_action = QAction("识别设置", self)
+        settings_action.triggered.connect(self.edit_ocr_settings)
+        self.tool_bar.addAction(settings_action)
+
         self.tool_bar.addSeparator()
 
-        export_excel_action = QAction("导出Excel", self)
+        export_excel_action = QAction("导出Excel/CSV", self)
         export_excel_action.triggered.connect(self.export_excel)
         self.tool_bar.addAction(export_excel_action)
 
@@ -198,6 +328,11 @@ class MainWindow(QMainWindow):
         self.progress_bar.setFixedWidth(300) # Give it a consistent size
         self.status_bar.addPermanentWidget(self.progress_bar)
 
+        self.cancel_export_button = QPushButton("取消导出")
+        self.cancel_export_button.clicked.connect(self.cancel_export)
+        self.cancel_export_button.hide()
+        self.status_bar.addPermanentWidget(self.cancel_export_button)
+
         # Central Widget
         self.central_widget = QWidget()
         self.setCentralWidget(self.central_widget)
@@ -207,9 +342,12 @@ class MainWindow(QMainWindow):
 
         # Left Panel for File List
         self.left_panel = QVBoxLayout()
-        self.file_list_widget = QListWidget()
-        self.file_list_widget.setSelectionMode(QListWidget.ExtendedSelection)
-        self.left_panel.addWidget(self.file_list_widget)
+        self.file_list_view = QListView()
+        self.file_list_view.setModel(self.file_list_model)
+        self.file_list_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        # All rows have the same height; lets the view skip per-row measuring.
+        self.file_list_view.setUniformItemSizes(True)
+        self.left_panel.addWidget(self.file_list_view)
 
         self.remove_file_button = QPushButton("移除文件")
         self.remove_file_button.clicked.connect(self.remove_selected_files)
@@ -222,6 +360,20 @@ class MainWindow(QMainWindow):
         # Right Panel for Table View
         self.right_panel = QVBoxLayout()
 
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText(
+            "筛选：姓名/身份证号/地址关键字，或 name:张 id:1101 addr:朝阳 "
+            "age:30-40 birth:1990..1995 expires:90"
+        )
+        self.filter_edit.setClearButtonEnabled(True)
+        # Re-run the query once typing pauses rather than on every key.
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(250)
+        self.filter_timer.timeout.connect(self.apply_filter)
+        self.filter_edit.textChanged.connect(self.filter_timer.start)
+        self.right_panel.addWidget(self.filter_edit)
+
         self.table_view = QTableView()
         self.table_view.setSelectionBehavior(QTableView.SelectRows)
         self.table_view.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -231,6 +383,8 @@ class MainWindow(QMainWindow):
         self.table_view.horizontalHeader().customContextMenuRequested.connect(self.show_header_context_menu)
         self.table_model = RecordTableModel(self.app_state)
         self.table_view.setModel(self.table_model)
+        # Edited values are not in the index any more.
+        self.table_model.dataChanged.connect(self.invalidate_record_index)
 
         # Hide status and raw_ocr_output columns by default
         try:
@@ -259,71 +413,337 @@ class MainWindow(QMainWindow):
         central_layout = QVBoxLayout(self.central_widget)
         central_layout.addWidget(self.splitter)
 
+        self.apply_model_precision()
+
+        # Load the OCR engine once the window is up rather than on first use.
+        self.warmup_thread = EngineWarmupThread(self)
+        self.warmup_thread.warmed_up.connect(self.on_engine_warmed_up)
+        QTimer.singleShot(0, self.warmup_thread.start)
+
     def select_files(self):
         files, _ = QFileDialog.getOpenFileNames(
-            self, "选择一个或多个文件", "", "Images (*.png *.xpm *.jpg *.bmp *.gif)"
+            self, "选择一个或多个文件", "",
+            "Images (*.png *.xpm *.jpg *.bmp *.gif);;"
+            "Documents (*.pdf *.tif *.tiff)"
         )
         if files:
             self.add_files_to_list(files)
 
+    @property
+    def selected_files(self):
+        return self.file_list_model.files()
+
     def select_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "选择文件夹")
-        if folder:
-            image_paths = []
-            for filename in os.listdir(folder):
-                if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif')):
-                    image_paths.append(os.path.join(folder, filename))
-            if image_paths:
-                self.add_files_to_list(image_paths)
+        if not folder:
+            return
+        if self.scan_worker and self.scan_worker.isRunning():
+            self.scan_worker.stop()
+            self.scan_worker.wait()
+        self.scan_worker = ScanWorker([folder])
+        self.scan_worker.batch_found.connect(self.add_files_to_list)
+        self.scan_worker.scan_finished.connect(self.on_scan_finished)
+        self.scan_worker.start()
+        self.status_bar.showMessage(f"正在扫描文件夹: {folder}...")
+
+    def on_scan_finished(self, total_found):
+        self.status_bar.showMessage(
+            f"扫描完成，共找到 {total_found} 个文件。"
+            f"当前共 {len(self.selected_files)} 个文件待处理。"
+        )
 
     def add_files_to_list(self, files):
-        for f in files:
-            if f not in self.selected_files:
-                self.selected_files.append(f)
-                self.file_list_widget.addItem(f)
+        added = self.file_list_model.add_files(files)
         self.status_bar.showMessage(
-            f"已添加 {len(files)} 个文件。"
+            f"已添加 {added} 个文件。"
             f"当前共 {len(self.selected_files)} 个文件待处理。"
         )
 
     def remove_selected_files(self):
-        for item in self.file_list_widget.selectedItems():
-            self.selected_files.remove(item.text())
-            self.file_list_widget.takeItem(self.file_list_widget.row(item))
+        selection = self.file_list_view.selectionModel().selectedRows()
+        self.file_list_model.remove_rows(index.row() for index in selection)
         self.status_bar.showMessage(
             f"已移除文件。当前共 {len(self.selected_files)} 个文件待处理。"
         )
 
     def start_ocr(self):
-        self.run_ocr_worker()
+        if not self.selected_files:
+            self.status_bar.showMessage("没有文件可供识别！")
+            return None
+        # Copy: a folder scan may still be appending to the list.
+        return self.run_ocr_worker(list(self.selected_files), LANE_BULK)
+
+    def start_urgent_ocr(self):
+        """Recognize the files selected in the list ahead of queued bulk jobs."""
+        files = self.file_list_model.files()
+        selection = self.file_list_view.selectionModel().selectedRows()
+        paths = [files[index.row()] for index in selection]
+        if not paths:
+            paths, _ = QFileDialog.getOpenFileNames(
+                self, "选择需要加急识别的文件", "",
+                "Images (*.png *.xpm *.jpg *.bmp *.gif);;"
+                "Documents (*.pdf *.tif *.tiff)"
+            )
+        if paths:
+            self.run_ocr_worker(paths, LANE_INTERACTIVE)
 
     def stop_ocr(self):
-        if self.worker and self.worker.isRunning():
-            self.worker.stop()
+        if self.workers:
+            for worker in self.workers:
+                worker.stop()
             self.status_bar.showMessage("识别已停止。")
 
-    def run_ocr_worker(self):
-        if not self.selected_files:
-            self.status_bar.showMessage("没有文件可供识别！")
+    def edit_ocr_settings(self):
+        """Ask for parallelism and document rasterization settings."""
+        prompts = [
+            ("ocr/max_workers", "并行识别数:", DEFAULT_MAX_WORKERS, 1, 32),
+            ("documents/dpi", "PDF/TIFF 渲染 DPI:", DEFAULT_DPI, 72, 600),
+            ("documents/pages_per_card",
+             "每张证件页数 (1=单页, 2=正反面连续两页):", 1, 1, 2),
+            ("documents/max_cards_per_sheet",
+             "每张扫描件最多证件数 (1=不拆分):", 4, 1, 8),
+        ]
+        for key, label, default, minimum, maximum in prompts:
+            current = self.settings.value(key, default, int)
+            value, ok = QInputDialog.getInt(
+                self, "识别设置", label, current, minimum, maximum
+            )
+            if not ok:
+                return
+            self.settings.setValue(key, value)
+
+        precisions = available_precisions()
+        if len(precisions) > 1:
+            current = self.settings.value("ocr/model_precision", DEFAULT_PRECISION)
+            precision, ok = QInputDialog.getItem(
+                self, "识别设置", "模型精度 (仅列出已通过精度校验的模型):", precisions,
+                precisions.index(current) if current in precisions else 0, False,
+            )
+            if not ok:
+                return
+            self.settings.setValue("ocr/model_precision", precision)
+            self.apply_model_precision()
+
+        raw_output_choices = {
+            RAW_OUTPUT_STORE: "保存到压缩文件（可在详情中查看）",
+            RAW_OUTPUT_SUMMARY: "仅保留摘要",
+        }
+        current = self.settings.value("ocr/raw_output", DEFAULT_RAW_OUTPUT_POLICY)
+        labels = list(raw_output_choices.values())
+        label, ok = QInputDialog.getItem(
+            self, "识别设置", "原始识别结果:", labels,
+            list(raw_output_choices).index(current)
+            if current in raw_output_choices else 0,
+            False,
+        )
+        if not ok:
+            return
+        policy = next(k for k, v in raw_output_choices.items() if v == label)
+        self.settings.setValue("ocr/raw_output", policy)
+        # The worker count applies once no job is using the scheduler.
+        if self.scheduler and not self.workers:
+            self.scheduler.shutdown()
+            self.scheduler = None
+        self.status_bar.showMessage("识别设置已保存。")
+
+    def apply_model_precision(self):
+        """Use the det/rec models of the configured precision for new engines."""
+        precision = self.settings.value("ocr/model_precision", DEFAULT_PRECISION)
+        try:
+            set_model_precision(precision)
+        except ValueError as e:
+            # E.g. the accepted models were removed; FP32 is always available.
+            logging.warning(f"Falling back to FP32 models: {e}")
+            self.settings.setValue("ocr/model_precision", DEFAULT_PRECISION)
+            set_model_precision(DEFAULT_PRECISION)
+
+    def toggle_hot_folder(self, checked):
+        if checked:
+            self.start_hot_folder()
+        else:
+            self.stop_hot_folder()
+
+    def start_hot_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "选择要监控的文件夹")
+        output_dir = folder and QFileDialog.getExistingDirectory(
+            self, "选择结果输出文件夹"
+        )
+        if not folder or not output_dir:
+            self.hot_folder_action.setChecked(False)
             return
-        self.worker = Worker(self.selected_files)
-        self.worker.finished.connect(self.on_ocr_finished)
-        self.worker.progress.connect(self.on_ocr_progress)
-        self.worker.grouping_started.connect(self.on_grouping_started)
-        self.worker.grouping_finished.connect(self.on_grouping_finished)
-        self.worker.ocr_started.connect(self.on_ocr_started)
-        self.worker.ocr_finished.connect(self.on_ocr_finished_single)
-        self.worker.ocr_error.connect(self.on_ocr_error)
-        self.worker.start()
-        self.status_bar.showMessage("正在识别中...")
-
-    def on_ocr_finished(self, new_app_state):
-        self.app_state = new_app_state
-        self.table_model.update_data(new_app_state)
+
+        if self.hot_folder_raw_store:
+            self.hot_folder_raw_store.close()
+        policy = self.settings.value("ocr/raw_output", DEFAULT_RAW_OUTPUT_POLICY)
+        self.hot_folder_raw_store = (
+            RawOCRStore() if policy == RAW_OUTPUT_STORE else None
+        )
+        self.hot_folder_worker = HotFolderWorker(
+            [folder], output_dir, self.hot_folder_raw_store
+        )
+        self.hot_folder_worker.record_ready.connect(self.on_hot_folder_record)
+
+        # Directory change notifications (inotify on Linux) wake the worker
+        # right away; it still polls if the watcher is unavailable.
+        self.folder_watcher = QFileSystemWatcher(self)
+        self.folder_watcher.directoryChanged.connect(self.on_watched_directory_changed)
+        self._watch_tree(folder)
+
+        self.hot_folder_worker.start()
+        self.status_bar.showMessage(
+            f"正在监控文件夹: {folder}，结果输出到 {output_dir}"
+        )
+
+    def stop_hot_folder(self):
+        if self.folder_watcher:
+            self.folder_watcher.deleteLater()
+            self.folder_watcher = None
+        if self.hot_folder_worker:
+            self.hot_folder_worker.stop()
+            self.hot_folder_worker.wait()
+            self.hot_folder_worker = None
+            self.status_bar.showMessage("已停止监控文件夹。")
+
+    def _watch_tree(self, root):
+        """Adds a directory and all of its subdirectories to the watcher."""
+        directories = [root]
+        for dirpath, dirnames, _ in os.walk(root):
+            directories.extend(os.path.join(dirpath, d) for d in dirnames)
+        watched = set(self.folder_watcher.directories())
+        new_directories = [d for d in directories if d not in watched]
+        if new_directories:
+            failed = self.folder_watcher.addPaths(new_directories)
+            if failed:
+                logging.warning(
+                    f"Cannot watch {len(failed)} directories; polling them."
+                )
+
+    def on_watched_directory_changed(self, path):
+        if not self.hot_folder_worker:
+            return
+        if os.path.isdir(path):
+            self._watch_tree(path)
+        self.hot_folder_worker.service.notify(path)
+
+    def on_hot_folder_record(self, record):
+        self.table_model.append_record(record)
+        self.status_bar.showMessage(
+            f"监控文件夹: 记录 {record.record_id} 识别{record.status}。"
+        )
+
+    def run_ocr_worker(self, image_paths, lane):
+        """Queue an OCR job and return its Worker; jobs run side by side on
+        the shared scheduler."""
+        if self.scheduler is None:
+            self.scheduler = JobScheduler(
+                bulk_workers=self.settings.value(
+                    "ocr/max_workers", DEFAULT_MAX_WORKERS, int
+                ),
+            )
+        if not self.workers:
+            # Nothing is running: results of this job start a new table.
+            if self.raw_store:
+                self.raw_store.close()
+            policy = self.settings.value("ocr/raw_output", DEFAULT_RAW_OUTPUT_POLICY)
+            self.raw_store = RawOCRStore() if policy == RAW_OUTPUT_STORE else None
+            self.scheduler.reset_record_ids()
+            self.app_state = AppState()
+            self.table_model.update_data(self.app_state)
+            self.invalidate_record_index()
+
+        worker = Worker(
+            self.scheduler, image_paths, lane,
+            dpi=self.settings.value("documents/dpi", DEFAULT_DPI, int),
+            pages_per_card=self.settings.value("documents/pages_per_card", 1, int),
+            max_cards_per_sheet=self.settings.value(
+                "documents/max_cards_per_sheet", 4, int
+            ),
+            raw_store=self.raw_store,
+        )
+        worker.finished.connect(lambda state, w=worker: self.on_ocr_finished(w, state))
+        worker.progress.connect(self.on_ocr_progress)
+        worker.grouping_started.connect(self.on_grouping_started)
+        worker.grouping_finished.connect(self.on_grouping_finished)
+        worker.ocr_started.connect(self.on_ocr_started)
+        worker.ocr_finished.connect(self.on_ocr_finished_single)
+        worker.ocr_error.connect(self.on_ocr_error)
+        worker.record_ready.connect(self.table_model.append_record)
+        worker.tier_summary.connect(self.on_tier_summary)
+        self.workers.append(worker)
+        worker.start()
+        if lane == LANE_INTERACTIVE:
+            self.status_bar.showMessage(f"正在加急识别 {len(image_paths)} 个文件...")
+        else:
+            self.status_bar.showMessage(
+                f"正在识别中...（共 {len(self.workers)} 个任务）"
+            )
+        return worker
+
+    def on_ocr_finished(self, worker, job_app_state):
+        worker.wait()
+        self.workers.remove(worker)
+        if worker.lane == LANE_INTERACTIVE:
+            self.status_bar.showMessage(
+                f"加急识别完成！共 {len(job_app_state.records)} 条记录。"
+            )
+        if self.workers:
+            return
+        # Records arrive in completion order; show them in record ID order.
+        # Sorted into a new list: an index still being built for the old
+        # order is then recognized as stale by on_record_index_built.
+        self.app_state.records = sorted(
+            self.app_state.records, key=lambda record: int(record.record_id)
+        )
+        self.table_model.update_data(self.app_state)
+        self.invalidate_record_index()
         self.status_bar.showMessage(
             f"识别完成！共找到 {len(self.app_state.records)} 条记录。"
         )
         self.progress_bar.setValue(0)
+        if self.filter_edit.text().strip():
+            self.apply_filter()
+
+    def invalidate_record_index(self, *args):
+        self.record_index = None
+
+    def apply_filter(self):
+        """Show only the records matching the filter box, using the index."""
+        text = self.filter_edit.text().strip()
+        if not text:
+            if self.table_model.is_filtered():
+                self.table_model.set_visible_rows(None)
+            return
+        try:
+            query = parse_filter(text)
+        except ValueError:
+            self.status_bar.showMessage("筛选条件格式有误。")
+            return
+
+        records = self.app_state.records
+        if self.record_index is None or self.record_index.size != len(records):
+            if self.index_thread is None:
+                self.status_bar.showMessage(f"正在为 {len(records)} 条记录建立索引...")
+                self.index_thread = IndexBuildThread(records, self)
+                self.index_thread.built.connect(self.on_record_index_built)
+                self.index_thread.start()
+            return
+
+        start = time.perf_counter()
+        rows = self.record_index.search(query)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.table_model.set_visible_rows(rows)
+        self.status_bar.showMessage(
+            f"筛选出 {len(rows)} / {len(records)} 条记录（{elapsed_ms:.1f} ms）。"
+        )
+
+    def on_record_index_built(self, index):
+        self.index_thread.wait()
+        source = self.index_thread.source
+        self.index_thread = None
+        # A new run may have replaced the records while the index was built.
+        if source is self.app_state.records:
+            self.record_index = index
+        self.apply_filter()
 
     def on_ocr_progress(self, percent):
         self.progress_bar.setValue(percent)
@@ -338,23 +758,79 @@ class MainWindow(QMainWindow):
     def on_ocr_started(self, group_id):
         self.status_bar.showMessage(f"正在识别组: {group_id}...")
 
+    def on_engine_warmed_up(self):
+        if not self.workers:
+            self.status_bar.showMessage("识别引擎已就绪")
+
     def on_ocr_finished_single(self, group_id, status):
+        startup_timer.mark("first_result")
         self.status_bar.showMessage(f"组 {group_id} 识别{status}。")
 
     def on_ocr_error(self, group_id, error_message):
         self.status_bar.showMessage(f"组 {group_id} 识别错误: {error_message}")
 
+    def on_tier_summary(self, summary):
+        self.status_bar.setToolTip(f"分级识别统计: {summary}")
+
+    def visible_column_keys(self):
+        return [
+            key for i, key in enumerate(self.app_state.column_settings['order'])
+            if not self.table_view.isColumnHidden(i)
+        ]
+
     def export_excel(self):
+        """Export the visible columns of all records on a background thread."""
         if not self.app_state.records:
             self.status_bar.showMessage("没有数据可导出！")
             return
+        if self.export_worker:
+            self.status_bar.showMessage("正在导出中，请稍候或取消当前导出。")
+            return
+
+        file_name, selected_filter = QFileDialog.getSaveFileName(
+            self, "导出数据", "", "Excel Files (*.xlsx);;CSV Files (*.csv)"
+        )
+        if not file_name:
+            return
+        if os.path.splitext(file_name)[1].lower() not in (".xlsx", ".csv"):
+            file_name += ".csv" if selected_filter.startswith("CSV") else ".xlsx"
 
-        file_name, _ = QFileDialog.getSaveFileName(
-            self, "保存Excel文件", "", "Excel Files (*.xlsx)"
+        column_keys = self.visible_column_keys()
+        self.export_worker = ExportWorker(
+            self.app_state.records, file_name, column_keys,
+            column_headers(self.app_state, column_keys), self,
         )
-        if file_name:
-            export_to_excel(self.app_state, file_name, self.table_view)
-            self.status_bar.showMessage(f"数据已导出到 {file_name}")
+        self.export_worker.progress.connect(self.on_export_progress)
+        self.export_worker.exported.connect(self.on_export_done)
+        self.export_worker.cancelled.connect(self.on_export_cancelled)
+        self.export_worker.failed.connect(self.on_export_failed)
+        self.export_worker.finished.connect(self.on_export_worker_finished)
+        self.cancel_export_button.show()
+        self.export_worker.start()
+        self.status_bar.showMessage(f"正在导出到 {file_name}...")
+
+    def cancel_export(self):
+        if self.export_worker:
+            self.export_worker.stop()
+
+    def on_export_progress(self, percent):
+        self.progress_bar.setValue(percent)
+        self.status_bar.showMessage(f"正在导出... {percent}%")
+
+    def on_export_done(self, path):
+        self.status_bar.showMessage(f"数据已导出到 {path}")
+
+    def on_export_cancelled(self):
+        self.status_bar.showMessage("导出已取消。")
+
+    def on_export_failed(self, error_message):
+        self.status_bar.showMessage(f"导出失败: {error_message}")
+
+    def on_export_worker_finished(self):
+        self.export_worker.wait()
+        self.export_worker = None
+        self.cancel_export_button.hide()
+        self.progress_bar.setValue(0)
 
     def show_header_context_menu(self, pos):
         header = self.table_view.horizontalHeader()
@@ -406,6 +882,26 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         """Save window geometry on close."""
         self.settings.setValue("geometry", self.saveGeometry())
+        self.stop_hot_folder()
+        if self.scan_worker:
+            self.scan_worker.stop()
+            self.scan_worker.wait()
+        for worker in self.workers:
+            worker.stop()
+            worker.wait()
+        if self.scheduler:
+            self.scheduler.shutdown()
+        # The warm-up thread cannot be interrupted; let it finish cleanly.
+        self.warmup_thread.wait()
+        if self.index_thread:
+            self.index_thread.wait()
+        if self.export_worker:
+            # A cancelled export removes its temporary file.
+            self.export_worker.stop()
+            self.export_worker.wait()
+        for store in (self.raw_store, self.hot_folder_raw_store):
+            if store:
+                store.close()
         super().closeEvent(event)
 
     def show_table_context_menu(self, pos):
@@ -418,32 +914,41 @@ class MainWindow(QMainWindow):
         paste_action = QAction("粘贴", self)
         paste_action.setEnabled(False)  # Paste is complex, disable for now
 
+        detail_row = self.table_view.indexAt(pos).row()
+        detail_action = QAction("查看详情", self)
+        detail_action.triggered.connect(lambda: self.show_record_detail(detail_row))
+        detail_action.setEnabled(detail_row >= 0)
+
         # Enable copy only if there is a selection
         if not self.table_view.selectionModel().hasSelection():
             copy_action.setEnabled(False)
 
         menu.addAction(copy_action)
         menu.addAction(paste_action)
+        menu.addSeparator()
+        menu.addAction(detail_action)
         
         menu.exec(self.table_view.viewport().mapToGlobal(pos))
 
+    def show_record_detail(self, row):
+        """Show a record with its raw OCR output, loaded from the side store."""
+        record = self.table_model.record_at(row)
+        payloads = None
+        for store in (self.raw_store, self.hot_folder_raw_store):
+            if store and record in store:
+                payloads = store.get(record)
+                break
+        RecordDetailDialog(record, payloads, self.app_state, self).exec()
+
     def copy_selection(self):
         """Copy the selected rows to the clipboard as tab-separated text."""
         selection_model = self.table_view.selectionModel()
         if not selection_model.hasSelection():
             return
 
-        # Get the data for the selected rows
-        rows = sorted(list(set(index.row() for index in selection_model.selectedIndexes())))
-        
-        clipboard_string = ""
-        for row in rows:
-            row_data = []
-            for column in range(self.table_model.columnCount()):
-                if not self.table_view.isColumnHidden(column):
-                    cell_value = self.table_model.index(row, column).data()
-                    row_data.append(str(cell_value) if cell_value is not None else "")
-            clipboard_string += "\t".join(row_data) + "\n"
+        rows = sorted({index.row() for index in selection_model.selectedIndexes()})
+        records = [self.table_model.record_at(row) for row in rows]
+        clipboard_string = RowSerializer(self.visible_column_keys()).tsv(records)
 
         clipboard = QApplication.clipboard()
         clipboard.setText(clipboard_string)
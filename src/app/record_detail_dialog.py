@@ -0,0 +1,43 @@
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import QDialog, QDialogButtonBox, QPlainTextEdit, QVBoxLayout
+
+from src.core.models import AppState
+
+
+class RecordDetailDialog(QDialog):
+    """Shows one record's fields and the raw OCR output it was built from.
+
+    The raw output is passed in already loaded from the RawOCRStore, so it is
+    only read from disk when the user opens this dialog.
+    """
+
+    def __init__(self, record, payloads, app_state: AppState, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"记录详情 - {record.record_id}")
+        self.resize(720, 560)
+
+        names = app_state.column_settings['custom_names']
+        lines = [
+            f"{names.get(key, key)}: {getattr(record, key, '')}"
+            for key in app_state.column_settings['order']
+        ]
+        lines.append(f"来源图片: {'; '.join(record.source_images)}")
+        lines.append("")
+        if payloads is None:
+            lines.append("未保存原始识别结果（当前策略只保留摘要）。")
+        for payload in payloads or []:
+            lines.append(f"== {payload.source} ({len(payload)} 行) ==")
+            for box, text, score in zip(payload.boxes, payload.txts, payload.scores):
+                corners = " ".join(f"({x:.0f},{y:.0f})" for x, y in box)
+                lines.append(f"{score:.3f}  {text}    {corners}")
+            lines.append("")
+
+        text_view = QPlainTextEdit("\n".join(lines))
+        text_view.setReadOnly(True)
+        text_view.setFont(QFont("monospace"))
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        buttons.rejected.connect(self.reject)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(text_view)
+        layout.addWidget(buttons)
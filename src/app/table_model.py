@@ -1,4 +1,4 @@
-from PySide6.QtCore import QAbstractTableModel, Qt
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
 from PySide6.QtGui import QColor
 
 from src.core.models import AppState
@@ -9,10 +9,29 @@ class RecordTableModel(QAbstractTableModel):
     def __init__(self, app_state: AppState, parent=None):
         super().__init__(parent)
         self.app_state = app_state
+        # Positions in app_state.records shown by the view; None shows all.
+        self._visible_rows = None
 
     def rowCount(self, parent=None):
+        if self._visible_rows is not None:
+            return len(self._visible_rows)
         return len(self.app_state.records)
 
+    def record_at(self, row):
+        """Return the record displayed in ``row``."""
+        if self._visible_rows is not None:
+            row = self._visible_rows[row]
+        return self.app_state.records[row]
+
+    def set_visible_rows(self, rows):
+        """Show only the records at positions ``rows`` (None shows all)."""
+        self.beginResetModel()
+        self._visible_rows = rows
+        self.endResetModel()
+
+    def is_filtered(self):
+        return self._visible_rows is not None
+
     def columnCount(self, parent=None):
         return len(self.app_state.column_settings['order'])
 
@@ -20,7 +39,7 @@ class RecordTableModel(QAbstractTableModel):
         if not index.isValid():
             return None
 
-        record = self.app_state.records[index.row()]
+        record = self.record_at(index.row())
 
         if role == Qt.DisplayRole or role == Qt.EditRole:
             column_key = self.app_state.column_settings['order'][index.column()]
@@ -53,7 +72,7 @@ class RecordTableModel(QAbstractTableModel):
             if not index.isValid():
                 return False
 
-            record = self.app_state.records[index.row()]
+            record = self.record_at(index.row())
             column_key = self.app_state.column_settings['order'][index.column()]
 
             # Prevent editing of certain fields
@@ -75,8 +94,20 @@ class RecordTableModel(QAbstractTableModel):
             return True
         return False
 
+    def append_record(self, record):
+        """Append a single record at the end of the table."""
+        if self._visible_rows is not None:
+            # Not matched against the active filter; shown once it changes.
+            self.app_state.records.append(record)
+            return
+        row = len(self.app_state.records)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.app_state.records.append(record)
+        self.endInsertRows()
+
     def update_data(self, new_app_state: AppState):
         """Inform the view that the model is about to change."""
         self.beginResetModel()
         self.app_state = new_app_state
+        self._visible_rows = None
         self.endResetModel()
@@ -0,0 +1,162 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+# ID-1 card size (85.6mm x 54mm) at 10 px/mm.
+CARD_WIDTH = 856
+CARD_HEIGHT = 540
+CARD_ASPECT = CARD_WIDTH / CARD_HEIGHT
+
+# Edge analysis runs on a downscaled copy; this bounds its cost.
+_DETECT_MAX_SIDE = 1000
+
+# Thresholds for finding several cards on one sheet (see detect_cards).
+_MIN_CARD_AREA_RATIO = 0.02  # of the sheet area
+_MAX_ASPECT_ERROR = 0.12
+_MIN_FILL_RATIO = 0.85  # contour area / bounding rotated rectangle area
+
+
+@dataclass
+class CardLocation:
+    """A located card: its corner points in the source image and a fit score."""
+    quad: np.ndarray  # 4x2 float32, ordered tl, tr, br, bl
+    fit: float  # 0.0 (poor) .. 1.0 (perfect aspect ratio and coverage)
+
+
+def _order_corners(points: np.ndarray) -> np.ndarray:
+    """Orders four points as top-left, top-right, bottom-right, bottom-left."""
+    points = points.reshape(4, 2).astype(np.float32)
+    sums = points.sum(axis=1)
+    diffs = np.diff(points, axis=1).ravel()
+    return np.array([
+        points[np.argmin(sums)],
+        points[np.argmin(diffs)],
+        points[np.argmax(sums)],
+        points[np.argmax(diffs)],
+    ], dtype=np.float32)
+
+
+def _quad_fit(quad: np.ndarray, image_area: float) -> float:
+    """Scores how card-like a quadrilateral is by aspect ratio and coverage."""
+    tl, tr, br, bl = quad
+    width = (np.linalg.norm(tr - tl) + np.linalg.norm(br - bl)) / 2
+    height = (np.linalg.norm(bl - tl) + np.linalg.norm(br - tr)) / 2
+    if width <= 0 or height <= 0:
+        return 0.0
+    aspect_error = abs(width / height - CARD_ASPECT) / CARD_ASPECT
+    coverage = cv2.contourArea(quad) / image_area
+    return max(0.0, 1.0 - aspect_error * 4) * min(1.0, coverage / 0.2)
+
+
+def locate_card(image: np.ndarray) -> Optional[CardLocation]:
+    """Finds the most card-like quadrilateral in an image.
+
+    Falls back to the full image frame when the image itself already has a
+    card's aspect ratio (a tightly cropped scan has no visible card edge).
+    """
+    height, width = image.shape[:2]
+    gray, scale = _downscale(image)
+    edges = cv2.Canny(cv2.GaussianBlur(gray, (5, 5), 0), 50, 150)
+    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    small_area = float(gray.shape[0] * gray.shape[1])
+    best = None
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+        approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(approx) != 4 or not cv2.isContourConvex(approx):
+            continue
+        quad = _order_corners(approx)
+        fit = _quad_fit(quad, small_area)
+        if best is None or fit > best.fit:
+            best = CardLocation(quad=quad / scale, fit=fit)
+
+    frame = np.array(
+        [[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]],
+        dtype=np.float32,
+    )
+    frame_fit = _quad_fit(frame, float(width * height))
+    if best is None or frame_fit > best.fit:
+        best = CardLocation(quad=frame, fit=frame_fit)
+    return best
+
+
+def _downscale(image: np.ndarray):
+    height, width = image.shape[:2]
+    scale = min(1.0, _DETECT_MAX_SIDE / max(height, width))
+    small = cv2.resize(image, None, fx=scale, fy=scale) if scale < 1.0 else image
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+    return gray, scale
+
+
+def detect_cards(image: np.ndarray, max_cards: int = 4) -> List[CardLocation]:
+    """Finds every card on a multi-card scan (e.g. several cards on one A4 sheet).
+
+    Outer contours of the edge map are reduced to rotated rectangles and
+    filtered in one vectorized pass by size, aspect ratio and fill ratio.
+    Cards are returned in reading order (top-to-bottom, left-to-right);
+    each quad is ordered so that its long side runs from tl to tr. The
+    result is deterministic for a given image, so callers can re-detect
+    instead of storing the quads.
+    """
+    gray, scale = _downscale(image)
+    edges = cv2.Canny(cv2.GaussianBlur(gray, (5, 5), 0), 30, 120)
+    # Close gaps in the card outline and merge the printed content with it.
+    edges = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, np.ones((7, 7), np.uint8))
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return []
+
+    rects = [cv2.minAreaRect(contour) for contour in contours]
+    sizes = np.array([rect[1] for rect in rects], dtype=np.float32).reshape(-1, 2)
+    long_side, short_side = sizes.max(axis=1), sizes.min(axis=1)
+    rect_areas = long_side * short_side
+    contour_areas = np.array([cv2.contourArea(c) for c in contours], dtype=np.float32)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        aspect_error = np.abs(long_side / short_side - CARD_ASPECT) / CARD_ASPECT
+        fill = contour_areas / rect_areas
+
+    sheet_area = float(gray.shape[0] * gray.shape[1])
+    keep = (
+        (rect_areas >= _MIN_CARD_AREA_RATIO * sheet_area)
+        & (aspect_error <= _MAX_ASPECT_ERROR)
+        & (fill >= _MIN_FILL_RATIO)
+    )
+    # Largest first, so that max_cards drops noise rather than cards.
+    candidates = sorted(np.flatnonzero(keep), key=lambda i: -rect_areas[i])[:max_cards]
+
+    cards = []
+    for i in candidates:
+        quad = _order_corners(cv2.boxPoints(rects[i]))
+        if np.linalg.norm(quad[1] - quad[0]) < np.linalg.norm(quad[3] - quad[0]):
+            # Portrait card: start from the bottom-left corner so the long side
+            # becomes the top edge after rectification.
+            quad = np.roll(quad, 1, axis=0)
+        fit = max(0.0, 1.0 - float(aspect_error[i]) * 4) * float(fill[i])
+        cards.append(CardLocation(quad=quad / scale, fit=fit))
+
+    # Reading order: cards whose tops are within half a card height share a row.
+    tolerance = max((float(short_side[i]) / scale for i in candidates), default=0) / 2
+    cards.sort(key=lambda c: float(c.quad[:, 1].min()))
+    rows: List[List[CardLocation]] = []
+    for card in cards:
+        top = float(card.quad[:, 1].min())
+        if rows and top - float(rows[-1][0].quad[:, 1].min()) <= tolerance:
+            rows[-1].append(card)
+        else:
+            rows.append([card])
+    return [card for row in rows
+            for card in sorted(row, key=lambda c: float(c.quad[:, 0].min()))]
+
+
+def rectify_card(image: np.ndarray, quad: np.ndarray) -> np.ndarray:
+    """Warps the card inside ``quad`` to a CARD_WIDTH x CARD_HEIGHT image."""
+    target = np.array(
+        [[0, 0], [CARD_WIDTH - 1, 0],
+         [CARD_WIDTH - 1, CARD_HEIGHT - 1], [0, CARD_HEIGHT - 1]],
+        dtype=np.float32,
+    )
+    matrix = cv2.getPerspectiveTransform(quad.astype(np.float32), target)
+    return cv2.warpPerspective(image, matrix, (CARD_WIDTH, CARD_HEIGHT))
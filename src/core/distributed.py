@@ -0,0 +1,404 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from src.core.models import IDCardRecord, ImageGroup
+
+# Job states. A leased job whose lease has expired is treated like a pending
+# one, so work held by a crashed worker is picked up again automatically.
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+DEFAULT_LEASE_SECONDS = 120.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    group_id TEXT NOT NULL,
+    image_paths TEXT NOT NULL UNIQUE,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker TEXT,
+    lease_until REAL,
+    finished_at REAL,
+    record_status TEXT,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_until);
+"""
+
+
+@dataclass
+class Job:
+    """A leased unit of work: one image group."""
+    job_id: int
+    group: ImageGroup
+    attempts: int
+
+
+@dataclass
+class QueueProgress:
+    """Aggregated progress over all workers."""
+    pending: int = 0
+    leased: int = 0
+    done: int = 0
+    failed: int = 0
+    retried: int = 0  # jobs that needed more than one attempt
+    records_per_second: float = 0.0  # completions over the last minute
+    workers: Dict[str, int] = field(default_factory=dict)  # jobs done per worker
+
+    @property
+    def total(self) -> int:
+        return self.pending + self.leased + self.done + self.failed
+
+    @property
+    def finished(self) -> bool:
+        return self.pending == 0 and self.leased == 0
+
+    def summary(self) -> str:
+        percent = (self.done + self.failed) / self.total if self.total else 1.0
+        return (
+            f"{self.done + self.failed}/{self.total} ({percent:.1%}) finished: "
+            f"{self.done} done, {self.failed} failed, {self.leased} in progress, "
+            f"{self.pending} pending, {self.retried} retried; "
+            f"{self.records_per_second:.1f} records/s from {len(self.workers)} workers."
+        )
+
+
+class JobQueue:
+    """A work queue of image groups stored in a SQLite database.
+
+    Any number of worker processes on the host holding the database file can
+    claim jobs. A claimed job carries a lease that the worker renews while
+    it runs; when a worker dies, its lease expires and the job is handed to
+    another worker, up to ``max_attempts`` attempts in total.
+
+    The database runs in WAL mode, whose shared-memory index only works when
+    all processes are on the same machine: keep the file on a local disk,
+    never on an NFS/SMB share.
+    """
+
+    def __init__(self, db_path: str, timeout: float = 30.0):
+        self.db_path = db_path
+        # Autocommit mode: transactions are opened explicitly below.
+        self._conn = sqlite3.connect(
+            db_path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def _transaction(self, body: Callable[[sqlite3.Connection], object]):
+        """Runs ``body`` in a write transaction (one writer at a time)."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = body(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def enqueue(
+        self, groups: Iterable[ImageGroup], max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    ) -> int:
+        """Adds groups as pending jobs; returns how many were new.
+
+        Groups already in the queue (same image paths) are skipped, so an
+        interrupted coordinator can simply be run again.
+        """
+        rows = [
+            (group.group_id, json.dumps(group.image_paths, ensure_ascii=False),
+             max_attempts)
+            for group in groups
+        ]
+
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (group_id, image_paths, max_attempts) "
+                "VALUES (?, ?, ?)",
+                rows,
+            )
+            return conn.total_changes - before
+
+        return self._transaction(insert)
+
+    @staticmethod
+    def _fail_expired(conn: sqlite3.Connection, now: float) -> int:
+        """Expired leases that used up their attempts are given up on."""
+        return conn.execute(
+            "UPDATE jobs SET state = ?, error = 'Lease expired "
+            "after the last attempt', finished_at = ? "
+            "WHERE state = ? AND lease_until < ? AND attempts >= max_attempts",
+            (FAILED, now, LEASED, now),
+        ).rowcount
+
+    def reap_expired(self) -> int:
+        """Fails jobs whose last allowed lease has expired; returns how many.
+
+        ``claim`` does this too, but with no live workers nobody claims, so
+        the progress checks call it to let the queue finish.
+        """
+        return self._transaction(lambda conn: self._fail_expired(conn, time.time()))
+
+    def claim(
+        self, worker: str, lease_seconds: float = DEFAULT_LEASE_SECONDS
+    ) -> Optional[Job]:
+        """Leases the next available job to ``worker``, or returns None."""
+
+        def take(conn):
+            now = time.time()
+            self._fail_expired(conn, now)
+            row = conn.execute(
+                "SELECT id, group_id, image_paths, attempts FROM jobs "
+                "WHERE state = ? OR (state = ? AND lease_until < ?) "
+                "ORDER BY id LIMIT 1",
+                (PENDING, LEASED, now),
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, group_id, image_paths, attempts = row
+            conn.execute(
+                "UPDATE jobs SET state = ?, worker = ?, lease_until = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (LEASED, worker, now + lease_seconds, job_id),
+            )
+            return Job(job_id, ImageGroup(group_id, json.loads(image_paths)),
+                       attempts + 1)
+
+        return self._transaction(take)
+
+    def renew(
+        self, job_id: int, worker: str, lease_seconds: float = DEFAULT_LEASE_SECONDS
+    ) -> bool:
+        """Extends a lease; False means the job is no longer held by ``worker``."""
+
+        def extend(conn):
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_until = ? "
+                "WHERE id = ? AND worker = ? AND state = ?",
+                (time.time() + lease_seconds, job_id, worker, LEASED),
+            )
+            return cursor.rowcount == 1
+
+        return self._transaction(extend)
+
+    def complete(
+        self, job_id: int, worker: str, record: IDCardRecord, record_status: str
+    ) -> bool:
+        """Stores the record of a finished job; ignored if the lease was lost."""
+
+        def store(conn):
+            cursor = conn.execute(
+                "UPDATE jobs SET state = ?, result = ?, record_status = ?, "
+                "finished_at = ?, lease_until = NULL, error = NULL "
+                "WHERE id = ? AND worker = ? AND state = ?",
+                (DONE, json.dumps(asdict(record), ensure_ascii=False),
+                 record_status, time.time(), job_id, worker, LEASED),
+            )
+            return cursor.rowcount == 1
+
+        return self._transaction(store)
+
+    def fail(self, job_id: int, worker: str, error: str) -> None:
+        """Returns a job to the queue after an error, or fails it for good
+        once it has used up its attempts."""
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE jobs SET state = CASE WHEN attempts >= max_attempts "
+            "THEN ? ELSE ? END, error = ?, lease_until = NULL, "
+            "finished_at = CASE WHEN attempts >= max_attempts THEN ? END "
+            "WHERE id = ? AND worker = ? AND state = ?",
+            (FAILED, PENDING, error, time.time(), job_id, worker, LEASED),
+        ))
+
+    def release(self, job_id: int, worker: str) -> None:
+        """Hands a job back unprocessed without counting the attempt."""
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE jobs SET state = ?, attempts = attempts - 1, lease_until = NULL "
+            "WHERE id = ? AND worker = ? AND state = ?",
+            (PENDING, job_id, worker, LEASED),
+        ))
+
+    def progress(self) -> QueueProgress:
+        self.reap_expired()
+        with self._lock:
+            now = time.time()
+            progress = QueueProgress()
+            for state, count in self._conn.execute(
+                "SELECT state, COUNT(*) FROM jobs GROUP BY state"
+            ):
+                setattr(progress, state, count)
+            progress.retried = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE attempts > 1"
+            ).fetchone()[0]
+            recent = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE finished_at >= ?", (now - 60,)
+            ).fetchone()[0]
+            progress.records_per_second = recent / 60.0
+            progress.workers = dict(self._conn.execute(
+                "SELECT worker, COUNT(*) FROM jobs WHERE state = ? GROUP BY worker",
+                (DONE,),
+            ))
+        return progress
+
+    def records(self) -> Iterator[IDCardRecord]:
+        """Yields the records of finished jobs in queue order.
+
+        Jobs that failed for good are reported as FAILED records so that
+        every group appears in the output.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, state, image_paths, result, error FROM jobs "
+                "WHERE state IN (?, ?) ORDER BY id",
+                (DONE, FAILED),
+            ).fetchall()
+        for job_id, state, image_paths, result, error in rows:
+            if state == DONE:
+                yield IDCardRecord(**json.loads(result))
+            else:
+                yield IDCardRecord(
+                    record_id=str(job_id),
+                    source_images=json.loads(image_paths),
+                    status="FAILED",
+                    raw_ocr_output=error or "",
+                )
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class _LeaseKeeper(threading.Thread):
+    """Renews a job's lease in the background while it is being processed."""
+
+    def __init__(self, queue: JobQueue, job: Job, worker: str, lease_seconds: float):
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.job = job
+        self.worker = worker
+        self.lease_seconds = lease_seconds
+        self.lost = threading.Event()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.lease_seconds / 3):
+            try:
+                renewed = self.queue.renew(
+                    self.job.job_id, self.worker, self.lease_seconds
+                )
+            except sqlite3.Error as e:
+                logging.warning(f"Could not renew lease of job {self.job.job_id}: {e}")
+                continue
+            if not renewed:
+                self.lost.set()
+                return
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def run_worker(
+    queue: JobQueue,
+    worker: Optional[str] = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    should_stop: Callable[[], bool] = lambda: False,
+    idle_wait: float = 2.0,
+    exit_when_empty: bool = True,
+) -> int:
+    """Processes jobs from ``queue`` until it is drained (or ``should_stop``).
+
+    Each group goes through the same two-tier pipeline as the desktop app.
+    Returns the number of jobs this worker completed.
+    """
+    # Imported here so that the coordinator does not need the OCR stack.
+    from src.core.pipeline import TierStats, process_group
+
+    worker = worker or default_worker_id()
+    stats = TierStats()
+    completed = 0
+    while not should_stop():
+        job = queue.claim(worker, lease_seconds)
+        if job is None:
+            if exit_when_empty and queue.progress().finished:
+                break
+            # Other workers still hold leases that may expire; wait for them.
+            time.sleep(idle_wait)
+            continue
+
+        keeper = _LeaseKeeper(queue, job, worker, lease_seconds)
+        keeper.start()
+        try:
+            record, record_status, error_msg = process_group(
+                job.group, str(job.job_id),
+                lambda: should_stop() or keeper.lost.is_set(), stats,
+            )
+        except Exception as e:
+            keeper.stop()
+            logging.error(f"Job {job.job_id} failed on attempt {job.attempts}: {e}",
+                          exc_info=True)
+            queue.fail(job.job_id, worker, str(e))
+            continue
+        keeper.stop()
+
+        if record is None:
+            if keeper.lost.is_set():
+                logging.warning(f"Lost the lease of job {job.job_id}; skipping it.")
+                continue
+            # Stopped mid-job: hand the job back without using up an attempt.
+            queue.release(job.job_id, worker)
+            break
+        if queue.complete(job.job_id, worker, record, record_status):
+            completed += 1
+        else:
+            logging.warning(f"Job {job.job_id} was reassigned before it completed.")
+
+    logging.info(f"Worker {worker} finished {completed} jobs. {stats.summary()}")
+    return completed
+
+
+def wait_for_completion(
+    queue: JobQueue,
+    interval: float = 5.0,
+    on_progress: Callable[[QueueProgress], None] = lambda progress: None,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> QueueProgress:
+    """Polls the queue until every job is done or failed."""
+    while True:
+        progress = queue.progress()
+        on_progress(progress)
+        if progress.finished or should_stop():
+            return progress
+        time.sleep(interval)
+
+
+def enqueue_paths(
+    queue: JobQueue, paths: List[str], max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    dpi: Optional[int] = None, pages_per_card: int = 1, max_cards_per_sheet: int = 4,
+) -> int:
+    """Groups input files the same way as the desktop app and enqueues them."""
+    from src.core.documents import DEFAULT_DPI
+    from src.core.grouping import group_sources
+
+    groups = group_sources(
+        paths, dpi or DEFAULT_DPI, pages_per_card, max_cards_per_sheet
+    )
+    return queue.enqueue(groups, max_attempts)
@@ -0,0 +1,255 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+DOCUMENT_EXTENSIONS = ('.pdf', '.tif', '.tiff')
+DEFAULT_DPI = 200
+
+# Pages of multi-page documents and cards cut out of multi-card scans are
+# addressed by virtual paths of the form
+#   "<file>#page=<n>&dpi=<dpi>&group=<g>"  a document page
+#   "<file>#card=<k>&quad=<x1,y1,...,x4,y4>" the k-th card on an image
+#   "<file>#page=<n>&dpi=<dpi>&group=<g>&card=<k>&quad=<...>"
+# (all indices 1-based). The quad is the card's outline as found when the
+# sheet was split, so the card can be cropped without detecting it again.
+# Virtual paths flow through grouping, OCR and IDCardRecord.source_images
+# like file paths, so every record keeps its file+page(+card) provenance.
+_FRAGMENT_SEPARATOR = '#'
+
+
+@dataclass
+class SourceRef:
+    """A page of a document and/or a single card on a multi-card scan."""
+    file_path: str
+    page: int = 0  # 1-based document page, 0 for plain image files
+    dpi: int = DEFAULT_DPI
+    group: int = 0  # card index within the document, 0 if not assigned
+    card: int = 0  # 1-based card on the page/image, 0 for the whole image
+    quad: Optional[Tuple[float, ...]] = None  # x1, y1, ..., x4, y4 of the card
+
+    def to_path(self) -> str:
+        fields = []
+        if self.page:
+            fields += [f"page={self.page}", f"dpi={self.dpi}", f"group={self.group}"]
+        if self.card:
+            fields.append(f"card={self.card}")
+        if self.card and self.quad:
+            fields.append("quad=" + ",".join(f"{v:.1f}" for v in self.quad))
+        if not fields:
+            return self.file_path
+        return f"{self.file_path}{_FRAGMENT_SEPARATOR}{'&'.join(fields)}"
+
+
+def is_document(path: str) -> bool:
+    return path.lower().endswith(DOCUMENT_EXTENSIONS)
+
+
+def parse_source_path(path: str) -> Optional[SourceRef]:
+    """Parses a virtual source path; returns None for ordinary file paths."""
+    file_path, sep, fragment = path.rpartition(_FRAGMENT_SEPARATOR)
+    if not sep:
+        return None
+    try:
+        fields = dict(part.split('=', 1) for part in fragment.split('&'))
+        ref = SourceRef(
+            file_path=file_path,
+            page=int(fields.get('page', 0)),
+            dpi=int(fields.get('dpi', DEFAULT_DPI)),
+            group=int(fields.get('group', 0)),
+            card=int(fields.get('card', 0)),
+        )
+        if 'quad' in fields:
+            ref.quad = tuple(float(v) for v in fields['quad'].split(','))
+    except ValueError:
+        return None
+    if ref.quad is not None and len(ref.quad) != 8:
+        return None
+    if not (ref.page or ref.card) or (ref.page and not is_document(file_path)):
+        return None
+    return ref
+
+
+def is_virtual_source(path: str) -> bool:
+    """True for document files and virtual paths, which need custom loading."""
+    return is_document(path) or parse_source_path(path) is not None
+
+
+def page_count(path: str) -> int:
+    """Returns the number of pages without loading the page contents."""
+    if path.lower().endswith('.pdf'):
+        import pymupdf
+
+        with pymupdf.open(path) as doc:
+            return doc.page_count
+    from PIL import Image
+
+    with Image.open(path) as img:
+        return getattr(img, 'n_frames', 1)
+
+
+def expand_documents(
+    paths: Iterable[str], dpi: int = DEFAULT_DPI, pages_per_card: int = 1
+) -> Iterator[str]:
+    """Replaces each PDF/TIFF in ``paths`` by one virtual path per page.
+
+    ``pages_per_card`` is 1 when every page holds a whole card, or 2 when the
+    front and back of a card are on consecutive pages. Other paths are
+    passed through unchanged.
+    """
+    for path in paths:
+        if not is_document(path) or parse_source_path(path):
+            yield path
+            continue
+        try:
+            count = page_count(path)
+        except Exception as e:
+            logging.error(f"Cannot read document {path}: {e}")
+            continue
+        for page in range(1, count + 1):
+            group = (page - 1) // pages_per_card + 1
+            yield SourceRef(path, page, dpi, group).to_path()
+
+
+def render_page(ref: SourceRef):
+    """Rasterizes a single page at ``ref.dpi`` into a BGR array.
+
+    Only the requested page is decoded; the rest of the document is never
+    loaded into memory.
+    """
+    import cv2
+    import numpy as np
+
+    if ref.file_path.lower().endswith('.pdf'):
+        import pymupdf
+
+        with pymupdf.open(ref.file_path) as doc:
+            pixmap = doc.load_page(ref.page - 1).get_pixmap(dpi=ref.dpi, alpha=False)
+            rgb = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(
+                pixmap.height, pixmap.width, pixmap.n
+            )
+            return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+    from PIL import Image
+
+    with Image.open(ref.file_path) as img:
+        img.seek(ref.page - 1)
+        frame = img.convert('RGB')
+        # Resample to the requested DPI when the TIFF records its own.
+        source_dpi = img.info.get('dpi', (ref.dpi, ref.dpi))[0] or ref.dpi
+        if abs(source_dpi - ref.dpi) > 1:
+            scale = ref.dpi / float(source_dpi)
+            width = max(1, round(frame.width * scale))
+            height = max(1, round(frame.height * scale))
+            frame = frame.resize((width, height))
+        return cv2.cvtColor(np.asarray(frame), cv2.COLOR_RGB2BGR)
+
+
+def _load_whole_image(ref: SourceRef):
+    """Loads the page or image file a reference points at, ignoring its card."""
+    if ref.page:
+        return render_page(ref)
+    if is_document(ref.file_path):
+        # A document passed without a page: use its first page.
+        return render_page(SourceRef(ref.file_path, 1))
+    from src.utils.image_io import read_image
+
+    return read_image(ref.file_path)
+
+
+@lru_cache(maxsize=4)
+def _load_sheet(file_path: str, page: int, dpi: int):
+    """Decoded multi-card sheets, kept so that the cards of one sheet (which
+    are queued one after another) share a single decode."""
+    return _load_whole_image(SourceRef(file_path, page, dpi))
+
+
+def load_source_image(path: str):
+    """Loads an image for OCR from a file path or a virtual source path.
+
+    For a card on a multi-card scan the selected card is returned cropped
+    and rectified, using the quad recorded in the path by
+    ``split_card_sheets``. Paths without a quad fall back to detecting the
+    cards again (detection is deterministic).
+    """
+    ref = parse_source_path(path) or SourceRef(path)
+    if not ref.card:
+        return _load_whole_image(ref)
+    image = _load_sheet(ref.file_path, ref.page, ref.dpi)
+    if image is None:
+        return None
+
+    import numpy as np
+
+    from src.core.card_detection import detect_cards, rectify_card
+
+    if ref.quad:
+        quad = np.array(ref.quad, dtype=np.float32).reshape(4, 2)
+    else:
+        cards = detect_cards(image)
+        if ref.card > len(cards):
+            raise ValueError(f"Card {ref.card} not found in {path}")
+        quad = cards[ref.card - 1].quad
+    return rectify_card(image, quad)
+
+
+def _looks_like_single_card(path: str) -> bool:
+    """Cheap header-only check: an image with a card's aspect ratio is
+    already a single card and does not need to be decoded for detection."""
+    from src.core.card_detection import CARD_ASPECT
+
+    try:
+        from PIL import Image
+
+        with Image.open(path) as img:
+            width, height = img.size
+    except Exception:
+        return False
+    aspect = max(width, height) / max(1, min(width, height))
+    return abs(aspect - CARD_ASPECT) / CARD_ASPECT < 0.1
+
+
+def _split_sheet(path: str, max_cards: int) -> List[str]:
+    """Detects the cards on one source; returns its per-card virtual paths."""
+    from src.core.card_detection import detect_cards
+
+    ref = parse_source_path(path) or SourceRef(path)
+    if ref.card or (not ref.page and _looks_like_single_card(path)):
+        return [path]
+    try:
+        image = _load_whole_image(ref)
+        cards = detect_cards(image, max_cards) if image is not None else []
+    except Exception as e:
+        logging.error(f"Card detection failed for {path}: {e}")
+        cards = []
+    if len(cards) <= 1:
+        return [path]
+    logging.info(f"Detected {len(cards)} cards in {path}")
+    return [
+        SourceRef(
+            ref.file_path, ref.page, ref.dpi, ref.group, index,
+            tuple(float(v) for v in card.quad.ravel()),
+        ).to_path()
+        for index, card in enumerate(cards, start=1)
+    ]
+
+
+def split_card_sheets(
+    paths: Iterable[str], max_cards: int = 4, max_workers: Optional[int] = None
+) -> Iterator[str]:
+    """Replaces each scan holding several cards by one virtual path per card.
+
+    Sources with zero or one detected card are passed through unchanged so
+    they keep the existing single-card handling (including template mode).
+    Sources are decoded and detected on ``max_workers`` threads (OpenCV
+    releases the GIL), and each card path carries its quad, so a sheet is
+    detected only once. Output order follows ``paths``.
+    """
+    workers = max_workers or max(1, min(8, os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for card_paths in executor.map(
+            lambda path: _split_sheet(path, max_cards), paths
+        ):
+            yield from card_paths
@@ -0,0 +1,354 @@
+import json
+import os
+import re
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.core.models import IDCardRecord, ImageGroup
+from src.core.raw_store import OCRPayload
+from src.utils.encoding_fix import repair_stats
+
+# Minimum time spent timing a replay; see _score.
+REPLAY_MIN_SECONDS = 0.2
+
+# Record fields compared against the labels of a corpus.
+EVAL_FIELDS = (
+    "name", "gender", "ethnicity", "birth_date", "id_number", "address",
+    "issuing_authority", "validity_period",
+)
+RECORD_STATUSES = ("SUCCESS", "PARTIAL", "FAILED")
+
+
+@dataclass
+class LabeledSample:
+    """One card of a labeled corpus: its images and the expected fields."""
+    sample_id: str
+    image_paths: List[str]
+    expected: Dict[str, str]  # only the fields present here are scored
+    fixture_path: str = ""  # stored OCR output of the images, if captured
+
+    def load_fixture(self) -> List[OCRPayload]:
+        """Reads the stored OCR payloads (one per image) of this sample."""
+        with open(self.fixture_path, encoding='utf-8') as f:
+            return [OCRPayload.from_dict(item) for item in json.load(f)]
+
+    def save_fixture(self, payloads: List[OCRPayload]) -> None:
+        with open(self.fixture_path, 'w', encoding='utf-8') as f:
+            json.dump([payload.to_dict() for payload in payloads], f,
+                      ensure_ascii=False)
+
+
+def load_corpus(manifest_path: str) -> List[LabeledSample]:
+    """Loads a labeled corpus from a JSON Lines manifest.
+
+    Each line looks like
+    ``{"id": "a", "images": ["a_1.jpg", "a_2.jpg"], "expected": {"name": ...}}``
+    with an optional ``"ocr": "fixtures/a.json"`` holding the stored OCR
+    output of the images; paths are relative to the manifest's directory.
+    """
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    samples = []
+    with open(manifest_path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                entry = json.loads(line)
+                samples.append(LabeledSample(
+                    sample_id=str(entry.get('id', line_number)),
+                    image_paths=[os.path.join(base, p) for p in entry['images']],
+                    expected={k: str(v) for k, v in entry['expected'].items()},
+                    fixture_path=(
+                        os.path.join(base, entry['ocr']) if entry.get('ocr') else ""
+                    ),
+                ))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"{manifest_path}:{line_number}: {e}") from e
+    return samples
+
+
+def _normalize(value) -> str:
+    return "".join(str(value).split()).upper()
+
+
+def save_corpus(samples: List[LabeledSample], manifest_path: str) -> None:
+    """Writes a manifest that load_corpus reads back into ``samples``."""
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        for sample in samples:
+            entry = {
+                'id': sample.sample_id,
+                'images': [os.path.relpath(p, base) for p in sample.image_paths],
+                'expected': sample.expected,
+            }
+            if sample.fixture_path:
+                entry['ocr'] = os.path.relpath(sample.fixture_path, base)
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+
+@dataclass
+class FieldScores:
+    """Per-field counts over the labeled values of a corpus.
+
+    ``predicted`` counts non-empty extracted values, so precision is
+    correct / predicted and recall is correct / labeled.
+    """
+    labeled: Dict[str, int] = field(default_factory=dict)
+    predicted: Dict[str, int] = field(default_factory=dict)
+    correct: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, record: IDCardRecord, expected: Dict[str, str]) -> None:
+        for name in EVAL_FIELDS:
+            if name not in expected:
+                continue
+            self.labeled[name] = self.labeled.get(name, 0) + 1
+            value = _normalize(getattr(record, name, ""))
+            if value:
+                self.predicted[name] = self.predicted.get(name, 0) + 1
+            if value == _normalize(expected[name]):
+                self.correct[name] = self.correct.get(name, 0) + 1
+
+    def _total(self, counts: Dict[str, int], name: Optional[str]) -> int:
+        return sum(counts.values()) if name is None else counts.get(name, 0)
+
+    def precision(self, name: Optional[str] = None) -> float:
+        """Share of extracted values that are right; all fields if no name."""
+        predicted = self._total(self.predicted, name)
+        return self._total(self.correct, name) / predicted if predicted else 1.0
+
+    def recall(self, name: Optional[str] = None) -> float:
+        return self.accuracy(name)
+
+    def accuracy(self, name: Optional[str] = None) -> float:
+        """Share of labeled values extracted exactly; all fields if no name."""
+        labeled = self._total(self.labeled, name)
+        return self._total(self.correct, name) / labeled if labeled else 1.0
+
+    def to_dict(self) -> Dict:
+        return {"labeled": self.labeled, "predicted": self.predicted,
+                "correct": self.correct}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "FieldScores":
+        return cls(dict(data["labeled"]), dict(data["predicted"]),
+                   dict(data["correct"]))
+
+
+@dataclass
+class CorpusResult:
+    scores: FieldScores
+    samples: int
+    seconds: float
+    statuses: Dict[str, int] = field(default_factory=dict)  # records by status
+
+    def status_rate(self, status: str) -> float:
+        return self.statuses.get(status, 0) / self.samples if self.samples else 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        return self.samples / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> Dict:
+        return {"samples": self.samples, "seconds": self.seconds,
+                "statuses": self.statuses, "fields": self.scores.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CorpusResult":
+        return cls(FieldScores.from_dict(data["fields"]), data["samples"],
+                   data["seconds"], dict(data["statuses"]))
+
+
+def _score(
+    samples: List[LabeledSample],
+    run: Callable[[LabeledSample], IDCardRecord],
+    min_seconds: float = 0.0,
+) -> CorpusResult:
+    """Scores one pass over the corpus.
+
+    With ``min_seconds`` the corpus is run again (at least three passes in
+    all) until that much time has passed, and the median pass is reported,
+    so that a corpus that takes milliseconds still gives a stable records/s.
+    """
+    scores = FieldScores()
+    statuses: Dict[str, int] = {}
+    start = time.perf_counter()
+    for sample in samples:
+        record = run(sample)
+        scores.add(record, sample.expected)
+        statuses[record.status] = statuses.get(record.status, 0) + 1
+    times = [time.perf_counter() - start]
+    if min_seconds > 0:
+        # The extra passes only time; keep the repair counts of the first.
+        counted = repair_stats.snapshot()
+        while len(times) < 3 or sum(times) < min_seconds:
+            start = time.perf_counter()
+            for sample in samples:
+                run(sample)
+            times.append(time.perf_counter() - start)
+        repair_stats.restore(counted)
+    return CorpusResult(scores, len(samples), statistics.median(times), statuses)
+
+
+def _group(sample: LabeledSample) -> ImageGroup:
+    return ImageGroup(group_id=sample.sample_id, image_paths=sample.image_paths)
+
+
+def evaluate_corpus(
+    samples: List[LabeledSample], profile: Optional[str], use_template: bool = False
+) -> CorpusResult:
+    """Runs OCR over the corpus and scores the records.
+
+    With a ``profile`` only that profile runs (no escalation); with None
+    each card goes through the tiered pipeline as in the app.
+    """
+    from src.core.pipeline import process_group, run_single_tier
+
+    if profile is None:
+        return _score(samples, lambda sample: process_group(
+            _group(sample), sample.sample_id, use_template=use_template
+        )[0])
+    return _score(samples, lambda sample: run_single_tier(
+        _group(sample), sample.sample_id, profile, use_template
+    )[0])
+
+
+def replay_corpus(
+    samples: List[LabeledSample], min_seconds: float = REPLAY_MIN_SECONDS
+) -> CorpusResult:
+    """Scores the corpus from its stored OCR output, without inference.
+
+    Only extraction runs (build_record, i.e. extract_info and its helpers),
+    so changes to it can be checked in seconds. The time reported is the
+    median of repeated passes lasting ``min_seconds`` in total. Raises
+    ValueError if a sample has no fixture; see capture_fixtures.
+    """
+    from src.core.pipeline import build_record
+
+    missing = [s.sample_id for s in samples if not s.fixture_path]
+    if missing:
+        raise ValueError(
+            f"{len(missing)} samples have no OCR fixture, e.g. {missing[0]}"
+        )
+    # Fixtures are read up front so that only extraction is timed.
+    fixtures = {sample.sample_id: sample.load_fixture() for sample in samples}
+    return _score(samples, lambda sample: build_record(
+        _group(sample), sample.sample_id, fixtures[sample.sample_id]
+    )[0], min_seconds)
+
+
+def capture_fixtures(
+    samples: List[LabeledSample], fixture_dir: str, profile: Optional[str] = None
+) -> None:
+    """Runs OCR once per sample and stores its output as the sample's fixture.
+
+    With a ``profile`` that profile's output is stored; with None, the output
+    the tiered pipeline based its record on.
+    """
+    from src.core.pipeline import _process_tiers, run_single_tier
+
+    os.makedirs(fixture_dir, exist_ok=True)
+    for sample in samples:
+        if profile is None:
+            _, _, _, payloads = _process_tiers(
+                _group(sample), sample.sample_id, lambda: False, None, 0, True
+            )
+        else:
+            _, _, _, payloads = run_single_tier(
+                _group(sample), sample.sample_id, profile
+            )
+        name = re.sub(r'[^\w.-]', '_', sample.sample_id)
+        sample.fixture_path = os.path.join(fixture_dir, f"{name}.json")
+        sample.save_fixture(payloads)
+
+
+def accuracy_gate(
+    baseline: FieldScores, candidate: FieldScores, max_drop: float = 0.01
+) -> Tuple[bool, List[str]]:
+    """Accepts a candidate whose accuracy is within ``max_drop`` of the
+    baseline overall and on every field.
+
+    Returns (passed, report lines).
+    """
+    passed = True
+    report = []
+    for name in (None,) + EVAL_FIELDS:
+        if name is not None and name not in baseline.labeled:
+            continue
+        base, cand = baseline.accuracy(name), candidate.accuracy(name)
+        ok = cand >= base - max_drop
+        passed = passed and ok
+        report.append(
+            f"{name or 'overall':<18}{base:7.1%} -> {cand:7.1%}"
+            f"{'' if ok else '  FAIL'}"
+        )
+    return passed, report
+
+
+def format_result(result: CorpusResult) -> List[str]:
+    """Per-field precision/recall, status rates and throughput as text lines."""
+    lines = [f"{'field':<18}{'labeled':>8}{'precision':>11}{'recall':>9}"]
+    for name in (None,) + EVAL_FIELDS:
+        if name is not None and name not in result.scores.labeled:
+            continue
+        labeled = result.scores.labeled
+        count = sum(labeled.values()) if name is None else labeled[name]
+        lines.append(
+            f"{name or 'overall':<18}{count:>8}"
+            f"{result.scores.precision(name):>11.1%}{result.scores.recall(name):>9.1%}"
+        )
+    lines.append("  ".join(
+        f"{status} {result.status_rate(status):.1%}" for status in RECORD_STATUSES
+    ))
+    lines.append(
+        f"{result.samples} records in {result.seconds:.2f}s "
+        f"({result.records_per_second:.1f} records/s)"
+    )
+    return lines
+
+
+def regression_check(
+    baseline: CorpusResult,
+    current: CorpusResult,
+    max_drop: float = 0.005,
+    max_slowdown: Optional[float] = 0.25,
+) -> Tuple[bool, List[str]]:
+    """Compares a run with a stored baseline of the same corpus.
+
+    Fails when the precision or recall of any field, or the SUCCESS rate,
+    drops by more than ``max_drop``, or when throughput falls by more than
+    ``max_slowdown`` (a fraction of the baseline's records/s). Throughput is
+    only comparable on the machine the baseline was made on; a
+    ``max_slowdown`` of None reports it without checking it.
+    Returns (passed, report lines).
+    """
+    checks = []
+    for name in (None,) + EVAL_FIELDS:
+        if name is not None and name not in baseline.scores.labeled:
+            continue
+        label = name or 'overall'
+        checks.append((f"{label} precision", baseline.scores.precision(name),
+                       current.scores.precision(name)))
+        checks.append((f"{label} recall", baseline.scores.recall(name),
+                       current.scores.recall(name)))
+    checks.append(("SUCCESS rate", baseline.status_rate("SUCCESS"),
+                   current.status_rate("SUCCESS")))
+
+    passed = True
+    report = []
+    for label, base, cand in checks:
+        ok = cand >= base - max_drop
+        passed = passed and ok
+        if not ok or cand != base:
+            report.append(f"{label:<28}{base:7.1%} -> {cand:7.1%}"
+                          f"{'' if ok else '  FAIL'}")
+
+    base_rate, rate = baseline.records_per_second, current.records_per_second
+    ok = (max_slowdown is None or not base_rate
+          or rate >= base_rate * (1 - max_slowdown))
+    passed = passed and ok
+    report.append(f"{'records/s':<28}{base_rate:7.1f} -> {rate:7.1f}"
+                  f"{'' if ok else '  FAIL'}")
+    return passed, report
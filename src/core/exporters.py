@@ -0,0 +1,168 @@
+import csv
+import logging
+import os
+import tempfile
+from operator import attrgetter
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from src.core.models import AppState, IDCardRecord
+
+EXPORT_FORMATS = ("xlsx", "csv")
+DEFAULT_CHUNK_SIZE = 5000
+
+# Tabs and line breaks inside a cell would split it in pasted TSV.
+_TSV_ESCAPES = str.maketrans({"\t": " ", "\r": " ", "\n": " "})
+
+
+def _read_umask() -> int:
+    # os.umask can only be read by setting it; done once at import, before
+    # any export thread runs.
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+_UMASK = _read_umask()
+
+
+def column_headers(app_state: AppState, column_keys: Sequence[str]) -> List[str]:
+    """Display names of ``column_keys``, as shown in the table header."""
+    names = app_state.column_settings['custom_names']
+    return [names.get(key, key.replace('_', ' ').title()) for key in column_keys]
+
+
+class RowSerializer:
+    """Turns records into rows of cell values, one column at a time.
+
+    Each column is read for all records with a single ``map`` over an
+    attrgetter, so no per-cell Python code runs for ordinary values; only
+    list values (e.g. source_images) are joined with ";".
+    """
+
+    def __init__(self, column_keys: Sequence[str]):
+        self.column_keys = list(column_keys)
+        self._getters = [attrgetter(key) for key in self.column_keys]
+
+    def columns(self, records: Sequence[IDCardRecord]) -> List[List]:
+        columns = []
+        for getter in self._getters:
+            values = list(map(getter, records))
+            if values and isinstance(values[0], (list, tuple)):
+                values = [";".join(value) for value in values]
+            columns.append(values)
+        return columns
+
+    def rows(self, records: Sequence[IDCardRecord]) -> List[Tuple]:
+        """Cell values with their original types (ints stay ints)."""
+        return list(zip(*self.columns(records)))
+
+    def text_rows(self, records: Sequence[IDCardRecord]) -> List[Tuple[str, ...]]:
+        columns = [
+            ["" if value is None else str(value) for value in column]
+            if any(not isinstance(value, str) for value in column) else column
+            for column in self.columns(records)
+        ]
+        return list(zip(*columns))
+
+    def tsv(self, records: Sequence[IDCardRecord]) -> str:
+        """Tab-separated text with a trailing newline, for the clipboard.
+
+        Tabs and line breaks inside cells become spaces.
+        """
+        return "".join(
+            "\t".join(cell.translate(_TSV_ESCAPES) for cell in row) + "\n"
+            for row in self.text_rows(records)
+        )
+
+
+def _chunks(records: Sequence, size: int) -> Iterator[Sequence]:
+    for start in range(0, len(records), size):
+        yield records[start:start + size]
+
+
+def _write_xlsx(path, headers, chunks):
+    # openpyxl is only imported when an Excel export is actually requested.
+    import openpyxl
+
+    # Write-only mode streams rows to disk instead of keeping cell objects.
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("ID Card Records")
+    sheet.append(headers)
+    for rows in chunks:
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+
+
+def _write_csv(path, headers, chunks):
+    # utf-8-sig so that Excel opens the Chinese headers correctly.
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for rows in chunks:
+            writer.writerows(rows)
+
+
+class ExportCancelled(Exception):
+    """Raised inside an export when ``should_stop`` fires."""
+
+
+def export_records(
+    records: Sequence[IDCardRecord],
+    path: str,
+    column_keys: Sequence[str],
+    headers: Sequence[str],
+    fmt: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_progress: Callable[[int, int], None] = lambda done, total: None,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> bool:
+    """Writes ``records`` to ``path`` as xlsx or csv (from the extension).
+
+    Rows are serialized and written ``chunk_size`` at a time; between chunks
+    ``on_progress(done, total)`` is called and ``should_stop`` checked. The
+    file is written under a temporary name in the same directory and moved
+    into place only when complete, so ``path`` is never left half-written.
+    Returns False if the export was cancelled.
+    """
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    writer = _write_xlsx if fmt == "xlsx" else _write_csv
+    serializer = RowSerializer(column_keys)
+    total = len(records)
+
+    def chunks():
+        done = 0
+        on_progress(0, total)
+        for chunk in _chunks(records, chunk_size):
+            if should_stop():
+                raise ExportCancelled()
+            rows = serializer.rows(chunk)
+            yield rows
+            done += len(rows)
+            on_progress(done, total)
+
+    fd, temp_path = tempfile.mkstemp(
+        prefix=".export_", suffix=f".{fmt}",
+        dir=os.path.dirname(os.path.abspath(path)),
+    )
+    os.close(fd)
+    try:
+        writer(temp_path, list(headers), chunks())
+        # mkstemp creates the file as 0600; give it the mode a plain open()
+        # would, or keep the mode of the file being replaced.
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except ExportCancelled:
+        logging.info(f"Export to {path} cancelled.")
+        return False
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    logging.info(f"Exported {total} records to {path}.")
+    return True
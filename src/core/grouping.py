@@ -1,21 +1,41 @@
 import os
 from collections import defaultdict
-from typing import List
+from typing import Iterable, List
 
+from src.core.documents import (
+    DEFAULT_DPI,
+    expand_documents,
+    parse_source_path,
+    split_card_sheets,
+)
 from src.core.models import ImageGroup
 
 
+def group_key(path: str) -> str:
+    """Returns the base name shared by the front/back images of one card."""
+    ref = parse_source_path(path)
+    file_path = ref.file_path if ref is not None else path
+    name_part, _ = os.path.splitext(os.path.basename(file_path))
+    if ref is not None and ref.page:
+        # Pages of one document are grouped by the card index assigned when
+        # the document was expanded (see documents.expand_documents).
+        key = f"{name_part}#{ref.group}" if ref.group else f"{name_part}#p{ref.page}"
+    elif '_' in name_part:
+        key = name_part.rsplit('_', 1)[0]
+    else:
+        key = name_part
+    if ref is not None and ref.card:
+        # The k-th card of a front sheet pairs with the k-th card of the
+        # matching back sheet.
+        key = f"{key}#c{ref.card}"
+    return key
+
+
 def group_images(image_paths: List[str]) -> List[ImageGroup]:
     """Groups image paths based on their base filenames."""
     groups = defaultdict(list)
     for path in image_paths:
-        filename = os.path.basename(path)
-        name_part, _ = os.path.splitext(filename)
-        if '_' in name_part:
-            base_name = name_part.rsplit('_', 1)[0]
-        else:
-            base_name = name_part
-        groups[base_name].append(path)
+        groups[group_key(path)].append(path)
 
     image_groups = []
     for base_name, paths in groups.items():
@@ -23,3 +43,23 @@ def group_images(image_paths: List[str]) -> List[ImageGroup]:
         image_groups.append(ImageGroup(group_id=base_name, image_paths=paths[:2]))
 
     return image_groups
+
+
+def group_sources(
+    paths: Iterable[str],
+    dpi: int = DEFAULT_DPI,
+    pages_per_card: int = 1,
+    max_cards_per_sheet: int = 4,
+) -> List[ImageGroup]:
+    """Expands documents and multi-card sheets, then groups the result.
+
+    This is the full input preparation shared by the desktop app and the
+    distributed coordinator, so both produce the same groups for the same
+    files. ``max_cards_per_sheet`` of 1 disables sheet splitting.
+    """
+    # PDF/TIFF files become one virtual entry per page before grouping.
+    sources = expand_documents(paths, dpi, pages_per_card)
+    # Sheets holding several cards become one virtual entry per card.
+    if max_cards_per_sheet > 1:
+        sources = split_card_sheets(sources, max_cards_per_sheet)
+    return group_images(list(sources))
@@ -0,0 +1,275 @@
+import csv
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.core.grouping import group_key
+from src.core.models import AppState, IDCardRecord, ImageGroup
+from src.core.pipeline import TierStats, process_group
+from src.core.raw_store import RawOCRStore
+from src.core.scanner import IMAGE_EXTENSIONS, walk_files
+
+
+@dataclass
+class _FileObservation:
+    size: int
+    mtime: float
+    changed_at: float  # when (size, mtime) was last seen to change
+
+
+@dataclass
+class _PendingGroup:
+    group_id: str
+    image_paths: List[str] = field(default_factory=list)
+    first_seen: float = 0.0
+
+
+class HotFolderIngestor:
+    """Turns files dropped into watched directories into ready ImageGroups.
+
+    A file is considered complete once its size and mtime have not changed for
+    ``settle_seconds``. Complete files are paired by ``group_key`` within the
+    same directory; a pair is released as soon as both sides are present, and
+    a lone image is released on its own after ``pair_timeout`` seconds.
+
+    Files listed in ``ingested`` (e.g. ``RollingCSVWriter.ingested_paths()``)
+    were recognized by an earlier run and are skipped.
+    """
+
+    def __init__(
+        self,
+        directories: Iterable[str],
+        settle_seconds: float = 1.0,
+        pair_timeout: float = 10.0,
+        extensions: Tuple[str, ...] = IMAGE_EXTENSIONS,
+        ingested: Iterable[str] = (),
+    ):
+        self.directories = [os.path.abspath(d) for d in directories]
+        self.settle_seconds = settle_seconds
+        self.pair_timeout = pair_timeout
+        self.extensions = extensions
+        self._observed: Dict[str, _FileObservation] = {}
+        self._ingested: Set[str] = {os.path.abspath(path) for path in ingested}
+        self._pending: Dict[Tuple[str, str], _PendingGroup] = {}
+
+    def _observe(self, path: str, size: int, mtime: float, now: float) -> bool:
+        """Updates the observation for a file; returns True once it has settled."""
+        previous = self._observed.get(path)
+        if previous is None or (previous.size, previous.mtime) != (size, mtime):
+            self._observed[path] = _FileObservation(size, mtime, now)
+            return False
+        return size > 0 and now - previous.changed_at >= self.settle_seconds
+
+    def poll(
+        self, changed_dirs: Optional[Iterable[str]] = None, now: Optional[float] = None
+    ) -> List[ImageGroup]:
+        """Scans for new files and returns the groups that are ready for OCR.
+
+        ``changed_dirs`` limits the directory walk to paths a watcher reported
+        as changed (None walks every watched directory, an empty list walks
+        none); files still settling are always re-checked.
+        """
+        now = time.monotonic() if now is None else now
+        roots = self.directories if changed_dirs is None else list(changed_dirs)
+
+        for root in roots:
+            for entry in walk_files(root, self.extensions):
+                if entry.path in self._ingested:
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue  # Removed between scandir and stat
+                if self._observe(entry.path, stat.st_size, stat.st_mtime, now):
+                    self._add_pending(entry.path, now)
+
+        # Files still being written may live outside changed_dirs on this pass.
+        for path in [p for p in self._observed if p not in self._ingested]:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self._observed[path]
+                continue
+            if self._observe(path, stat.st_size, stat.st_mtime, now):
+                self._add_pending(path, now)
+
+        return self._release(now)
+
+    def requeue(self, groups: Iterable[ImageGroup]):
+        """Returns released groups that were not processed; the next poll
+        releases them again."""
+        for group in groups:
+            key = (os.path.dirname(group.image_paths[0]), group.group_id)
+            pending = self._pending.setdefault(
+                key, _PendingGroup(group_id=group.group_id, first_seen=float("-inf"))
+            )
+            pending.image_paths.extend(group.image_paths)
+
+    def has_pending(self) -> bool:
+        """True while files are settling or waiting for their pair."""
+        return bool(self._observed or self._pending)
+
+    def _add_pending(self, path: str, now: float):
+        self._ingested.add(path)
+        self._observed.pop(path, None)
+        key = (os.path.dirname(path), group_key(path))
+        pending = self._pending.setdefault(
+            key, _PendingGroup(group_id=key[1], first_seen=now)
+        )
+        pending.image_paths.append(path)
+
+    def _release(self, now: float) -> List[ImageGroup]:
+        ready = []
+        for key, pending in list(self._pending.items()):
+            paired = len(pending.image_paths) >= 2
+            if paired or now - pending.first_seen >= self.pair_timeout:
+                del self._pending[key]
+                paths = sorted(pending.image_paths)
+                ready.append(
+                    ImageGroup(group_id=pending.group_id, image_paths=paths[:2])
+                )
+        return ready
+
+
+class RollingCSVWriter:
+    """Appends records to a CSV file in ``output_dir`` that rolls over daily.
+
+    The source images of every written record are also appended to
+    ``INGESTED_LOG`` in the same directory, so that a restarted hot folder
+    does not recognize them again.
+    """
+
+    INGESTED_LOG = "hotfolder_ingested.txt"
+
+    def __init__(self, output_dir: str, app_state: Optional[AppState] = None):
+        self.output_dir = output_dir
+        self.app_state = app_state or AppState()
+        self._day = None
+        self._file = None
+        self._writer = None
+        os.makedirs(output_dir, exist_ok=True)
+        self._ingested_path = os.path.join(output_dir, self.INGESTED_LOG)
+
+    def ingested_paths(self) -> Set[str]:
+        """Source images of all records written to this directory so far."""
+        try:
+            with open(self._ingested_path, encoding="utf-8") as f:
+                return {line.rstrip("\n") for line in f if line.strip()}
+        except FileNotFoundError:
+            return set()
+
+    def _open_for_today(self):
+        day = datetime.now().strftime("%Y%m%d")
+        if day == self._day:
+            return
+        self.close()
+        path = os.path.join(self.output_dir, f"hotfolder_{day}.csv")
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        # utf-8-sig so that Excel opens the Chinese headers correctly.
+        self._file = open(path, "a", newline="", encoding="utf-8-sig")
+        self._writer = csv.writer(self._file)
+        if is_new:
+            settings = self.app_state.column_settings
+            self._writer.writerow([
+                settings['custom_names'].get(key, key) for key in settings['order']
+            ] + ["source_images"])
+        self._day = day
+
+    def write(self, record: IDCardRecord):
+        self._open_for_today()
+        order = self.app_state.column_settings['order']
+        row = [getattr(record, key, "") for key in order]
+        self._writer.writerow(row + [";".join(record.source_images)])
+        self._file.flush()
+        # Logged after the row is flushed: a crash in between re-recognizes
+        # the files rather than losing them.
+        with open(self._ingested_path, "a", encoding="utf-8") as f:
+            f.writelines(path + "\n" for path in record.source_images)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+        self._file = None
+        self._writer = None
+        self._day = None
+
+
+class HotFolderService:
+    """Continuously feeds groups from a HotFolderIngestor through the OCR pipeline.
+
+    ``notify`` may be called from any thread (e.g. by a file system watcher)
+    to wake the loop and rescan just the changed directory. Without
+    notifications the folders are fully rescanned every ``full_scan_interval``
+    seconds, which is the polling fallback.
+    """
+
+    def __init__(
+        self,
+        ingestor: HotFolderIngestor,
+        writer: Optional[RollingCSVWriter] = None,
+        poll_interval: float = 2.0,
+        full_scan_interval: float = 2.0,
+        raw_store: Optional[RawOCRStore] = None,
+    ):
+        self.ingestor = ingestor
+        self.writer = writer
+        self.raw_store = raw_store
+        self.poll_interval = poll_interval
+        self.full_scan_interval = full_scan_interval
+        self.stats = TierStats()
+        self._wake = threading.Event()
+        self._changed: Set[str] = set()
+        self._changed_lock = threading.Lock()
+        self._next_id = 1
+
+    def notify(self, changed_dir: Optional[str] = None):
+        if changed_dir:
+            with self._changed_lock:
+                self._changed.add(os.path.abspath(changed_dir))
+        self._wake.set()
+
+    def run(
+        self,
+        should_stop: Callable[[], bool],
+        on_record: Callable[[IDCardRecord], None] = lambda record: None,
+    ):
+        last_full_scan = float("-inf")
+        while not should_stop():
+            now = time.monotonic()
+            with self._changed_lock:
+                changed, self._changed = self._changed, set()
+            if now - last_full_scan >= self.full_scan_interval:
+                roots = None
+                last_full_scan = now
+            else:
+                roots = changed
+
+            ready = self.ingestor.poll(roots, now)
+            for index, group in enumerate(ready):
+                record = None
+                if not should_stop():
+                    record, _, _ = process_group(
+                        group, str(self._next_id), should_stop, self.stats,
+                        raw_store=self.raw_store,
+                    )
+                if record is None:
+                    # Stopping: keep the unprocessed groups for the next run.
+                    self.ingestor.requeue(ready[index:])
+                    break
+                self._next_id += 1
+                if self.writer:
+                    self.writer.write(record)
+                on_record(record)
+
+            # Wake up sooner while files are settling or waiting for a pair.
+            timeout = self.poll_interval
+            if self.ingestor.has_pending():
+                timeout = min(timeout, self.ingestor.settle_seconds)
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+        if self.writer:
+            self.writer.close()
@@ -0,0 +1,83 @@
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+
+# Numeric precisions the det/rec models can run at. "fp32" is the stock
+# RapidOCR model set; the others are produced by scripts/quantize_models.py
+# and only used once they have passed the accuracy gate.
+MODEL_PRECISIONS = ("fp32", "int8", "fp16")
+DEFAULT_PRECISION = "fp32"
+MANIFEST_NAME = "accepted.json"
+
+
+def quantized_model_dir() -> str:
+    """Directory holding quantized models and their acceptance manifest."""
+    if getattr(sys, 'frozen', False):
+        base = sys._MEIPASS
+    else:
+        base = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    return os.path.join(base, 'models', 'quantized')
+
+
+@dataclass
+class ModelVariant:
+    """A quantized det/rec model pair that passed the accuracy gate."""
+    precision: str
+    det_path: str  # relative to the manifest directory
+    rec_path: str
+    baseline_accuracy: float  # FP32 field accuracy on the labeled corpus
+    accuracy: float  # field accuracy of this variant on the same corpus
+    speedup: float  # FP32 seconds / variant seconds on the corpus
+    accepted_at: str = ""
+
+
+def load_manifest(model_dir: Optional[str] = None) -> Dict[str, ModelVariant]:
+    """Returns the accepted variants by precision (empty if none)."""
+    path = os.path.join(model_dir or quantized_model_dir(), MANIFEST_NAME)
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    return {precision: ModelVariant(**entry) for precision, entry in data.items()}
+
+
+def save_variant(variant: ModelVariant, model_dir: Optional[str] = None) -> None:
+    """Records ``variant`` as accepted, replacing one of the same precision."""
+    model_dir = model_dir or quantized_model_dir()
+    manifest = load_manifest(model_dir)
+    manifest[variant.precision] = variant
+    path = os.path.join(model_dir, MANIFEST_NAME)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({k: asdict(v) for k, v in manifest.items()}, f,
+                  ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def available_precisions(model_dir: Optional[str] = None) -> list:
+    """FP32 plus every precision with an accepted variant."""
+    accepted = load_manifest(model_dir)
+    return [p for p in MODEL_PRECISIONS if p == DEFAULT_PRECISION or p in accepted]
+
+
+def variant_params(precision: str, model_dir: Optional[str] = None) -> Dict[str, str]:
+    """RapidOCR parameters that select the det/rec models of ``precision``.
+
+    Raises ValueError for a precision without an accepted variant, so an
+    unvalidated model is never used by accident.
+    """
+    if precision == DEFAULT_PRECISION:
+        return {}
+    if precision not in MODEL_PRECISIONS:
+        raise ValueError(f"Unknown model precision: {precision}")
+    model_dir = model_dir or quantized_model_dir()
+    variant = load_manifest(model_dir).get(precision)
+    if variant is None:
+        raise ValueError(f"No accepted {precision} models in {model_dir}")
+    return {
+        "Det.model_path": os.path.join(model_dir, variant.det_path),
+        "Rec.model_path": os.path.join(model_dir, variant.rec_path),
+    }
@@ -1,40 +1,214 @@
 import logging
+import os
+import queue
 import re
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Optional
-
-from rapidocr import RapidOCR
+from typing import TYPE_CHECKING, Dict, Iterator, Optional, Tuple
 
+from src.core.documents import is_virtual_source, load_source_image
 from src.core.models import IDCardRecord
-from src.utils.encoding_fix import fix_garbled_text
+from src.core.raw_store import OCRPayload
+from src.utils.encoding_fix import fix_lines, repair_stats
 from src.utils.helpers import get_info_from_id_number, parse_validity_period
 
-# --- RapidOCR Engine Instance (Singleton) ---
-_rapidocr_engine = None
+if TYPE_CHECKING:
+    from rapidocr import RapidOCR
+
+# --- OCR Profiles ---
+# "fast" uses the library's default (mobile/small) models and is tried first.
+# "accurate" uses the server models and a larger detection input; it is only
+# used for groups the fast pass could not fully extract.
+# Values are plain strings so this module can be imported without rapidocr;
+# they are converted to rapidocr's enums when an engine is created.
+OCR_PROFILES: Dict[str, Dict] = {
+    "fast": {},
+    "accurate": {
+        "Det.ocr_version": "PP-OCRv4",
+        "Det.model_type": "server",
+        "Det.limit_side_len": 1280,
+        "Rec.ocr_version": "PP-OCRv4",
+        "Rec.model_type": "server",
+        "Global.max_side_len": 3000,
+    },
+}
+DEFAULT_PROFILE = "fast"
+_FAST_PARAMS = dict(OCR_PROFILES[DEFAULT_PROFILE])
+
+# --- RapidOCR Engine Pools (one pool per profile) ---
+# rapidocr (and onnxruntime/cv2 behind it) is imported on first use so that
+# the UI can start without paying for it.
+# RapidOCR keeps per-call flags (use_det/use_cls/use_rec) on the engine, so an
+# engine is lent to one thread at a time. Up to _pool_size engines are created
+# per profile so that several images can be recognized in parallel.
+_engine_pools: Dict[str, "queue.Queue[RapidOCR]"] = {
+    profile: queue.Queue() for profile in OCR_PROFILES
+}
+_engine_counts: Dict[str, int] = {profile: 0 for profile in OCR_PROFILES}
+_engine_lock = threading.Lock()
+_pool_size = 1
+_intra_op_threads: Optional[int] = None
 
-def get_rapidocr_engine() -> RapidOCR:
-    global _rapidocr_engine
-    if _rapidocr_engine is None:
-        logging.info("Initializing RapidOCR engine...")
-        _rapidocr_engine = RapidOCR()
-        logging.info("RapidOCR engine initialized successfully.")
-    return _rapidocr_engine
 
+def set_engine_pool_size(size: int) -> None:
+    """Sets how many engines per profile may run concurrently.
 
-def ocr_image(image_path: str) -> Optional[List[List]]:
+    Engines already created are kept; the size only caps new creations.
     """
-    Processes an image using RapidOCR and returns its raw output.
-    RapidOCR output format: list[list[bbox, text, confidence]]
+    global _pool_size
+    _pool_size = max(1, size)
+
+
+def set_engine_threads(threads: Optional[int]) -> None:
+    """Fixes the onnxruntime threads per engine for engines created later.
+
+    Used when several OCR processes share one host; None restores the
+    default (all cores, split between the engines of the pool).
+    """
+    global _intra_op_threads
+    _intra_op_threads = max(1, threads) if threads else None
+
+
+def register_profile(name: str, params: Dict) -> None:
+    """Adds (or replaces) an OCR profile; its existing engines are dropped."""
+    with _engine_lock:
+        OCR_PROFILES[name] = dict(params)
+        # Engines still lent out are returned to the old queue and discarded.
+        _engine_pools[name] = queue.Queue()
+        _engine_counts[name] = 0
+
+
+def set_model_precision(precision: str) -> None:
+    """Runs the fast profile on the accepted det/rec models of ``precision``.
+
+    The accurate profile keeps the FP32 server models. Raises ValueError
+    when no variant of that precision has passed the accuracy gate.
     """
-    logging.info(f"Processing image with RapidOCR: {image_path}")
-    engine = get_rapidocr_engine()
+    from src.core.model_variants import variant_params
+
+    register_profile(DEFAULT_PROFILE, {**_FAST_PARAMS, **variant_params(precision)})
+    logging.info(f"Fast OCR profile uses {precision} models.")
+
+
+def _create_engine(profile: str) -> "RapidOCR":
+    logging.info(f"Initializing RapidOCR engine ({profile})...")
+    import rapidocr
+    logging.debug(f"rapidocr loaded from: {rapidocr.__file__}")
+    params = dict(OCR_PROFILES[profile])
+    # rapidocr only accepts its enum types for these keys.
+    enum_types = {"ocr_version": rapidocr.OCRVersion, "model_type": rapidocr.ModelType}
+    for key, value in params.items():
+        enum_type = enum_types.get(key.rsplit(".", 1)[-1])
+        if enum_type is not None and isinstance(value, str):
+            params[key] = enum_type(value)
+    if _intra_op_threads:
+        params["EngineConfig.onnxruntime.intra_op_num_threads"] = _intra_op_threads
+    elif _pool_size > 1:
+        # Split the cores between engines instead of oversubscribing them.
+        threads = max(1, (os.cpu_count() or 1) // _pool_size)
+        params["EngineConfig.onnxruntime.intra_op_num_threads"] = threads
+    engine = rapidocr.RapidOCR(params=params or None)
+    logging.info(f"RapidOCR engine ({profile}) initialized successfully.")
+    return engine
+
+
+@contextmanager
+def acquire_engine(profile: str = DEFAULT_PROFILE) -> Iterator["RapidOCR"]:
+    """Borrows an engine for ``profile``, creating one if the pool allows."""
+    if profile not in OCR_PROFILES:
+        raise ValueError(f"Unknown OCR profile: {profile}")
+    pool = _engine_pools[profile]
+    engine = None
+    with _engine_lock:
+        try:
+            engine = pool.get_nowait()
+        except queue.Empty:
+            if _engine_counts[profile] < _pool_size:
+                _engine_counts[profile] += 1
+                create = True
+            else:
+                create = False
+    if engine is None:
+        if create:
+            try:
+                engine = _create_engine(profile)
+            except Exception:
+                with _engine_lock:
+                    _engine_counts[profile] -= 1
+                raise
+        else:
+            engine = pool.get()
     try:
-            result = engine(image_path) # result is RapidOCROutput object
+        yield engine
+    finally:
+        pool.put(engine)
+
+
+def warm_up_engine(profile: str = DEFAULT_PROFILE) -> None:
+    """Creates an engine and runs a tiny inference so that the detection and
+    recognition sessions are loaded before the first real image arrives."""
+    import numpy as np
+
+    blank = np.full((48, 320, 3), 255, dtype=np.uint8)
+    with acquire_engine(profile) as engine:
+        engine(blank, use_det=True, use_cls=True, use_rec=True)
+        _recognize_crop(engine, blank)
+    logging.info(f"RapidOCR engine ({profile}) warmed up.")
+
+
+def _recognize_crop(engine: "RapidOCR", crop) -> Tuple[str, float]:
+    """Runs recognition only (no detection/classification) on one text line."""
+    result = engine(crop, use_det=False, use_cls=False, use_rec=True)
+    txts = getattr(result, 'txts', None)
+    scores = getattr(result, 'scores', None)
+    if not txts:
+        return "", 0.0
+    return txts[0], float(scores[0]) if scores else 0.0
+
+
+def ocr_image(
+    image_path: str, profile: str = DEFAULT_PROFILE, use_template: bool = False
+) -> Optional[OCRPayload]:
+    """
+    Processes an image using RapidOCR and returns its raw output (boxes,
+    texts and scores). The engine result, which also holds the decoded
+    image, is converted to a compact OCRPayload and dropped right away.
+
+    With ``use_template``, the card is located and only the fixed field
+    regions are recognized, skipping text detection. Full-image detection
+    is used when the template does not fit.
+    """
+    logging.info(f"Processing image with RapidOCR ({profile}): {image_path}")
+    try:
+        image = image_path
+        if use_template or is_virtual_source(image_path):
+            # Decoding/rasterizing happens before an engine is borrowed so it
+            # can overlap with other threads' inference.
+            image = load_source_image(image_path)
+            if image is None:
+                raise ValueError(f"Could not read image: {image_path}")
+
+        with acquire_engine(profile) as engine:
+            if use_template:
+                from src.core.template import ocr_card_template
+
+                result = ocr_card_template(
+                    image, lambda crop: _recognize_crop(engine, crop)
+                )
+                if result:
+                    logging.debug(f"Template OCR used for {image_path}")
+                    return OCRPayload.from_result(result, image_path)
+
+            # Flags are passed explicitly because RapidOCR keeps per-call
+            # overrides (e.g. the template's use_det=False) on the engine.
+            # result is a RapidOCROutput object.
+            result = engine(image, use_det=True, use_cls=True, use_rec=True)
             logging.debug(f"Type of RapidOCR result: {type(result)}")
             logging.debug(f"Dir of RapidOCR result: {dir(result)}")
 
             if result:
-                return result # Return the RapidOCROutput object itself for now
+                return OCRPayload.from_result(result, image_path)
             else:
                 logging.warning(f"No OCR results found for {image_path}.")
                 return None
@@ -70,13 +244,11 @@ def extract_info(
     for box, text, score in zip(ocr_results.boxes, ocr_results.txts, ocr_results.scores):
         results_list.append([box, text, score])
 
-    # Attempt to fix garbled text for each item.
-    fixed_results = []
-    for item in results_list:
-        text = item[1]
-        if text:
-            text = fix_garbled_text(text)
-        fixed_results.append([item[0], text, item[2]])
+    # Attempt to fix garbled text; a pre-check skips the (usual) clean lines.
+    fixed_texts = fix_lines((item[1] for item in results_list), repair_stats)
+    fixed_results = [
+        [item[0], text, item[2]] for item, text in zip(results_list, fixed_texts)
+    ]
 
     # --- Final Unified Extraction Logic ---
 
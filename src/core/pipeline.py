@@ -0,0 +1,286 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from src.core.models import IDCardRecord, ImageGroup
+from src.core.ocr import extract_info, ocr_image
+from src.core.raw_store import OCRPayload, RawOCRStore
+
+# Fields compared when auditing fast-tier results against the accurate tier.
+AUDIT_FIELDS = [
+    "name", "id_number", "address", "issuing_authority", "validity_period"
+]
+
+
+@dataclass
+class TierStats:
+    """Collects timing and outcome counters for the two-tier OCR strategy."""
+    total_groups: int = 0
+    fast_accepted: int = 0
+    escalated: int = 0
+    rescued: int = 0
+    fast_seconds: float = 0.0
+    accurate_seconds: float = 0.0
+    accurate_groups: int = 0
+    audited: int = 0
+    audit_matches: int = 0
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def add(self, **deltas) -> None:
+        """Adds to counters; safe to call from several worker threads."""
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def record_accurate(self, seconds: float):
+        self.add(accurate_seconds=seconds, accurate_groups=1)
+
+    def summary(self) -> str:
+        """Returns a one-line report comparing tiered OCR with accurate-only OCR."""
+        if not self.total_groups:
+            return "No groups processed."
+        actual = self.fast_seconds + self.accurate_seconds
+        if self.accurate_groups:
+            # Estimate what running every group on the accurate tier would cost.
+            avg_accurate = self.accurate_seconds / self.accurate_groups
+            baseline = avg_accurate * self.total_groups
+            saved = (
+                f"{baseline - actual:.1f}s saved vs. accurate-only "
+                f"({baseline:.1f}s est.)"
+            )
+        else:
+            saved = "accurate tier not used"
+        if self.audited:
+            kept = (
+                f"{self.audit_matches / self.audited:.1%} agreement on "
+                f"{self.audited} audited groups"
+            )
+        else:
+            kept = "no audit samples"
+        return (
+            f"{self.fast_accepted}/{self.total_groups} groups accepted on fast tier, "
+            f"{self.escalated} escalated ({self.rescued} rescued); "
+            f"{actual:.1f}s total, {saved}; accuracy kept: {kept}."
+        )
+
+
+def _run_tier(
+    group: ImageGroup,
+    record_id: str,
+    profile: str,
+    should_stop: Callable[[], bool],
+    use_template: bool = False,
+) -> Tuple[Optional[IDCardRecord], str, str, List[OCRPayload]]:
+    """Runs OCR and extraction for one group on a single profile.
+
+    Returns (record, status, error_msg, payloads); record is None if stopped.
+    ``payloads`` are the compact raw OCR outputs of the group's images.
+    """
+    all_ocr_results = []
+    record_status = "SUCCESS"
+    error_msg = ""
+
+    try:
+        for image_path in group.image_paths:
+            if should_stop():
+                return None, "", "", []
+            ocr_result = ocr_image(
+                image_path, profile=profile, use_template=use_template
+            )
+            if ocr_result:
+                all_ocr_results.append(ocr_result)
+    except Exception as e:
+        record_status = "FAILED"
+        error_msg = str(e)
+
+    if should_stop():
+        return None, "", "", []
+
+    if record_status == "FAILED":
+        record = IDCardRecord(
+            record_id=record_id,
+            source_images=group.image_paths,
+            status="FAILED",
+            raw_ocr_output=error_msg
+        )
+        return record, record_status, error_msg, all_ocr_results
+
+    record, record_status, error_msg = build_record(
+        group, record_id, all_ocr_results
+    )
+    return record, record_status, error_msg, all_ocr_results
+
+
+def build_record(
+    group: ImageGroup, record_id: str, payloads: List[OCRPayload]
+) -> Tuple[IDCardRecord, str, str]:
+    """Extracts one record from the OCR output of a group's images.
+
+    This is everything after inference, so stored payloads can be replayed
+    through it without an engine. Returns (record, status, error_msg).
+    """
+    record_status = "SUCCESS"
+    error_msg = ""
+
+    if payloads:
+        # Create a single record for the group to merge info into.
+        record = IDCardRecord(record_id=record_id)
+        try:
+            # Loop through results from all images (front and back)
+            # and update the same record.
+            for ocr_result in payloads:
+                record = extract_info(ocr_result, record=record)
+
+        except Exception as e:
+            logging.error(
+                f"Failed to extract info for group {group.group_id}: {e}",
+                exc_info=True,
+            )
+            try:
+                # Log a concise summary of all OCR results in the group
+                for i, ocr_res in enumerate(payloads):
+                    log_str = (
+                        f"Problematic OCR data (Image {i+1}) - "
+                        f"txts: {getattr(ocr_res, 'txts', 'N/A')}, "
+                        f"scores: {getattr(ocr_res, 'scores', 'N/A')}"
+                    )
+                    logging.error(log_str)
+            except Exception as log_e:
+                logging.error(f"Could not log concise OCR data: {log_e}")
+
+            record_status = "FAILED"
+            error_msg = f"Info extraction failed: {e}"
+            record.status = "FAILED"
+            record.raw_ocr_output = error_msg
+
+        # Final validation
+        if record_status == "SUCCESS" and (not record.name or not record.id_number):
+            record.status = "FAILED"
+            record_status = "FAILED"
+
+        record.source_images = group.image_paths
+        if not record.raw_ocr_output:
+            try:
+                # Store a summary if no specific error was recorded
+                record.raw_ocr_output = f"{len(payloads)} images processed."
+            except Exception:
+                record.raw_ocr_output = "Could not represent OCR data."
+    else:
+        # Create a failed record if OCR returns nothing
+        record = IDCardRecord(
+            record_id=record_id,
+            source_images=group.image_paths,
+            status="FAILED",
+            raw_ocr_output=error_msg
+        )
+        record_status = "FAILED"
+
+    return record, record_status, error_msg
+
+
+def run_single_tier(
+    group: ImageGroup,
+    record_id: str,
+    profile: str,
+    use_template: bool = False,
+) -> Tuple[Optional[IDCardRecord], str, str, List[OCRPayload]]:
+    """Runs one OCR profile on a group without escalation or auditing.
+
+    Used to measure a profile on its own, e.g. when comparing model
+    precisions. Returns (record, status, error_msg, payloads).
+    """
+    return _run_tier(group, record_id, profile, lambda: False, use_template)
+
+
+def process_group(
+    group: ImageGroup,
+    record_id: str,
+    should_stop: Callable[[], bool] = lambda: False,
+    stats: Optional[TierStats] = None,
+    audit_every: int = 0,
+    use_template: bool = True,
+    raw_store: Optional[RawOCRStore] = None,
+) -> Tuple[Optional[IDCardRecord], str, str]:
+    """Processes one image group with the two-tier OCR strategy.
+
+    The fast profile runs first (in template mode when ``use_template`` is
+    set) and its record is kept when extraction reports SUCCESS.
+    PARTIAL/FAILED groups are re-run on the accurate profile with full
+    detection, and the better of the two records is returned. When
+    ``audit_every`` is set, every Nth accepted group is also run on the
+    accurate profile to measure how much accuracy the fast tier keeps.
+
+    The raw OCR output behind the returned record is written to
+    ``raw_store`` when given and dropped otherwise.
+
+    Returns (record, status, error_msg); record is None if stopped.
+    """
+    record, record_status, error_msg, payloads = _process_tiers(
+        group, record_id, should_stop, stats, audit_every, use_template
+    )
+    if record is not None and raw_store is not None and payloads:
+        raw_store.put(record, payloads)
+    return record, record_status, error_msg
+
+
+def _process_tiers(
+    group: ImageGroup,
+    record_id: str,
+    should_stop: Callable[[], bool],
+    stats: Optional[TierStats],
+    audit_every: int,
+    use_template: bool,
+) -> Tuple[Optional[IDCardRecord], str, str, List[OCRPayload]]:
+    """process_group without the raw store; also returns the chosen payloads."""
+    if stats is None:
+        stats = TierStats()
+
+    start = time.perf_counter()
+    record, record_status, error_msg, payloads = _run_tier(
+        group, record_id, "fast", should_stop, use_template
+    )
+    stats.add(fast_seconds=time.perf_counter() - start)
+    if record is None:
+        return None, "", "", []
+    stats.add(total_groups=1)
+
+    if record.status == "SUCCESS":
+        stats.add(fast_accepted=1)
+        if audit_every and stats.fast_accepted % audit_every == 0:
+            start = time.perf_counter()
+            audit_record, _, _, _ = _run_tier(
+                group, record_id, "accurate", should_stop
+            )
+            stats.record_accurate(time.perf_counter() - start)
+            if audit_record is not None:
+                matches = all(
+                    getattr(record, f) == getattr(audit_record, f) for f in AUDIT_FIELDS
+                )
+                stats.add(audited=1, audit_matches=int(matches))
+        return record, record_status, error_msg, payloads
+
+    stats.add(escalated=1)
+    logging.info(
+        f"Group {group.group_id} was {record.status} on fast tier, "
+        "retrying on accurate tier."
+    )
+    start = time.perf_counter()
+    retry, retry_status, retry_error, retry_payloads = _run_tier(
+        group, record_id, "accurate", should_stop
+    )
+    stats.record_accurate(time.perf_counter() - start)
+    if retry is None:
+        return None, "", "", []
+
+    if _status_rank(retry.status) > _status_rank(record.status):
+        stats.add(rescued=1)
+        return retry, retry_status, retry_error, retry_payloads
+    return record, record_status, error_msg, payloads
+
+
+def _status_rank(status: str) -> int:
+    return {"FAILED": 0, "PARTIAL": 1, "SUCCESS": 2}.get(status, 0)
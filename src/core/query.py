@@ -0,0 +1,265 @@
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from src.core.models import IDCardRecord
+
+# Text fields with prefix and substring indexes, and the n-gram length used
+# for each substring index: names are short Chinese strings (single
+# characters are selective enough), ID numbers are digits (trigrams keep the
+# posting lists short), addresses are long Chinese strings.
+TEXT_FIELDS: Dict[str, int] = {"name": 1, "id_number": 3, "address": 2}
+RANGE_FIELDS = ("age", "birth_date", "expiry_date")
+
+# Stands in for the expiry date of "长期" (long-term) cards so that they sort
+# after every real date.
+LONG_TERM_EXPIRY = "9999-12-31"
+
+_PAD = "\x00"  # pads n-grams at the end of a value
+_MAX_CHAR = "\U0010ffff"  # sorts after any character; bounds prefix ranges
+
+_DATE_DIGITS = re.compile(r"(\d{4})\D?(\d{2})\D?(\d{2})")
+
+
+def expiry_date(validity_period: str) -> str:
+    """Returns the end of a validity period as YYYY-MM-DD, or "" if unknown."""
+    _, sep, end = validity_period.partition("-")
+    if not sep:
+        return ""
+    if "长期" in end:
+        return LONG_TERM_EXPIRY
+    match = _DATE_DIGITS.search(end)
+    return "-".join(match.groups()) if match else ""
+
+
+def _normalize_date(text: str) -> str:
+    """Accepts YYYY, YYYY-MM, YYYY-MM-DD (any or no separator) as a date prefix."""
+    text = text.strip()
+    match = _DATE_DIGITS.fullmatch(text)
+    if match:
+        return "-".join(match.groups())
+    if len(text) == 6 and text.isdigit():  # YYYYMM
+        return f"{text[:4]}-{text[4:]}"
+    return re.sub(r"\D", "-", text)
+
+
+class _TextIndex:
+    """Prefix and substring lookups over one text field.
+
+    Prefixes are found by binary search in the sorted values. Substrings
+    are found through an inverted n-gram index: the shortest posting list of
+    the query's n-grams gives the candidates, which are then verified.
+    Values are padded so that every character starts an n-gram, which lets
+    queries shorter than n be answered from the grams they begin.
+    """
+
+    def __init__(self, values: Sequence[str], n: int):
+        self.values = values
+        self.n = n
+        order = sorted(range(len(values)), key=values.__getitem__)
+        self._sorted_values = [values[i] for i in order]
+        self._sorted_rows = array("i", order)
+        padding = _PAD * (n - 1)
+        postings: Dict[str, array] = defaultdict(lambda: array("i"))
+        for row, value in enumerate(values):
+            padded = value + padding
+            for gram in {padded[i:i + n] for i in range(len(value))}:
+                postings[gram].append(row)
+        self._postings = dict(postings)
+        self._grams = sorted(self._postings)
+
+    def prefix(self, prefix: str) -> Set[int]:
+        lo = bisect_left(self._sorted_values, prefix)
+        hi = bisect_left(self._sorted_values, prefix + _MAX_CHAR, lo)
+        return set(self._sorted_rows[lo:hi])
+
+    def substring(self, text: str) -> Set[int]:
+        if len(text) < self.n:
+            lo = bisect_left(self._grams, text)
+            hi = bisect_left(self._grams, text + _MAX_CHAR, lo)
+            rows: Set[int] = set()
+            for gram in self._grams[lo:hi]:
+                rows.update(self._postings[gram])
+            return rows
+        grams = {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
+        lists = [self._postings.get(gram) for gram in grams]
+        if any(rows is None for rows in lists):
+            return set()
+        candidates = min(lists, key=len)
+        if len(text) == self.n:
+            return set(candidates)
+        values = self.values
+        return {row for row in candidates if text in values[row]}
+
+
+class _RangeIndex:
+    """Sorted keys for inclusive range queries; empty values are skipped."""
+
+    def __init__(self, values: Sequence):
+        order = sorted(
+            (row for row, value in enumerate(values) if value not in ("", None)),
+            key=values.__getitem__,
+        )
+        self._keys = [values[row] for row in order]
+        self._rows = array("i", order)
+
+    def between(self, low=None, high=None) -> Set[int]:
+        lo = 0 if low is None else bisect_left(self._keys, low)
+        hi = len(self._keys) if high is None else bisect_right(self._keys, high)
+        return set(self._rows[lo:hi])
+
+
+@dataclass
+class RecordQuery:
+    """Filters combined with AND; unset filters match everything.
+
+    Ranges are inclusive ``(low, high)`` tuples where either end may be
+    None. Dates are YYYY-MM-DD strings.
+    """
+    text: str = ""  # words, each a substring of name, ID number or address
+    prefixes: Dict[str, str] = field(default_factory=dict)  # field -> prefix
+    substrings: Dict[str, str] = field(default_factory=dict)  # field -> text
+    age: Optional[Tuple[Optional[int], Optional[int]]] = None
+    birth_date: Optional[Tuple[Optional[str], Optional[str]]] = None
+    expiry_date: Optional[Tuple[Optional[str], Optional[str]]] = None
+
+    def is_empty(self) -> bool:
+        return not (self.text or self.prefixes or self.substrings or self.age
+                    or self.birth_date or self.expiry_date)
+
+
+class RecordIndex:
+    """An in-memory index over a list of records.
+
+    Build it once after a run (or whenever the records change); queries
+    return positions in the indexed list in ascending order.
+    """
+
+    def __init__(self, records: Sequence[IDCardRecord]):
+        self.size = len(records)
+        self._text = {
+            name: _TextIndex([getattr(r, name) or "" for r in records], n)
+            for name, n in TEXT_FIELDS.items()
+        }
+        self._ranges = {
+            "age": _RangeIndex([r.age if r.birth_date else None for r in records]),
+            "birth_date": _RangeIndex([r.birth_date for r in records]),
+            "expiry_date": _RangeIndex(
+                [expiry_date(r.validity_period) for r in records]
+            ),
+        }
+
+    def prefix(self, field_name: str, prefix: str) -> Set[int]:
+        return self._text[field_name].prefix(prefix)
+
+    def substring(self, field_name: str, text: str) -> Set[int]:
+        return self._text[field_name].substring(text)
+
+    def range(self, field_name: str, low=None, high=None) -> Set[int]:
+        return self._ranges[field_name].between(low, high)
+
+    def expiring_within(self, days: int, today: Optional[date] = None) -> Set[int]:
+        """Cards whose validity ends between today and ``days`` from now."""
+        today = today or date.today()
+        return self.range(
+            "expiry_date", today.isoformat(), (today + timedelta(days=days)).isoformat()
+        )
+
+    def search(self, query: RecordQuery) -> List[int]:
+        if query.is_empty():
+            return list(range(self.size))
+        # The most selective filters usually come first, so the running
+        # intersection shrinks quickly.
+        result: Optional[Set[int]] = None
+        for rows in self._filters(query):
+            result = rows if result is None else result & rows
+            if not result:
+                return []
+        return sorted(result)
+
+    def _filters(self, query: RecordQuery) -> Iterable[Set[int]]:
+        for name, prefix in query.prefixes.items():
+            yield self.prefix(name, prefix)
+        for name, text in query.substrings.items():
+            yield self.substring(name, text)
+        for word in query.text.split():
+            yield set().union(*(self.substring(name, word) for name in TEXT_FIELDS))
+        for name in RANGE_FIELDS:
+            bounds = getattr(query, name)
+            if bounds is not None:
+                yield self.range(name, *bounds)
+
+
+# Filter box syntax, e.g. "张 age:30-40 expires:90 addr:朝阳"
+_FIELD_ALIASES = {
+    "name": "name", "姓名": "name",
+    "id": "id_number", "身份证": "id_number",
+    "addr": "address", "address": "address", "地址": "address",
+}
+
+
+def _parse_bounds(text: str, convert) -> Tuple:
+    low, sep, high = text.partition("..") if ".." in text else text.partition("~")
+    if not sep:
+        low, sep, high = text.partition("-")
+    if not sep:
+        return convert(text), convert(text)
+    return (convert(low) if low else None), (convert(high) if high else None)
+
+
+def _date_bounds(text: str) -> Tuple[Optional[str], Optional[str]]:
+    """"1990" -> whole year, "1990..1995" -> both years, "2024-05" -> month."""
+    low, sep, high = text.partition("..")
+    if not sep:
+        low, sep, high = text.partition("~")
+    if not sep:
+        low = high = text
+    low, high = _normalize_date(low), _normalize_date(high)
+    # A date prefix covers everything that starts with it.
+    return (low or None), ((high + _MAX_CHAR) if high else None)
+
+
+def parse_filter(text: str, today: Optional[date] = None) -> RecordQuery:
+    """Parses the filter box syntax into a RecordQuery.
+
+    Plain words match name, ID number or address. ``name:`` and ``id:``
+    match a prefix, ``addr:`` a substring. ``age:30-40``, ``birth:1990..1995``
+    and ``expiry:2025-01..2025-06`` are ranges (either end may be left out),
+    and ``expires:90`` keeps cards expiring within 90 days. Raises
+    ValueError for malformed terms.
+    """
+    query = RecordQuery()
+    words = []
+    for term in text.split():
+        key, sep, value = term.partition(":")
+        if not sep:
+            key, sep, value = term.partition("：")  # full-width colon
+        key = key.lower()
+        if not sep or not value:
+            words.append(term)
+        elif key in _FIELD_ALIASES:
+            name = _FIELD_ALIASES[key]
+            if name == "address":
+                query.substrings[name] = value
+            else:
+                query.prefixes[name] = value.upper() if name == "id_number" else value
+        elif key in ("age", "年龄"):
+            query.age = _parse_bounds(value, int)
+        elif key in ("birth", "出生"):
+            query.birth_date = _date_bounds(value)
+        elif key in ("expiry", "有效期"):
+            query.expiry_date = _date_bounds(value)
+        elif key in ("expires", "到期"):
+            today = today or date.today()
+            days = int(value)
+            query.expiry_date = (
+                today.isoformat(), (today + timedelta(days=days)).isoformat()
+            )
+        else:
+            words.append(term)
+    query.text = " ".join(words)
+    return query
@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from src.core.models import IDCardRecord
+
+# What happens to the raw OCR output (boxes, text, scores) of each record:
+#   "store"    compressed into a RawOCRStore on disk, loaded on demand
+#   "summary"  only the short summary in IDCardRecord.raw_ocr_output is kept
+RAW_OUTPUT_STORE = "store"
+RAW_OUTPUT_SUMMARY = "summary"
+RAW_OUTPUT_POLICIES = (RAW_OUTPUT_STORE, RAW_OUTPUT_SUMMARY)
+DEFAULT_RAW_OUTPUT_POLICY = RAW_OUTPUT_STORE
+
+
+@dataclass
+class OCRPayload:
+    """The raw OCR output of one image, without the engine's image arrays.
+
+    Has the same ``boxes``/``txts``/``scores`` attributes as the engine
+    result, so extract_info accepts it directly.
+    """
+    boxes: List[List[List[float]]] = field(default_factory=list)
+    txts: Tuple[str, ...] = ()
+    scores: Tuple[float, ...] = ()
+    source: str = ""
+
+    def __len__(self) -> int:
+        return len(self.txts)
+
+    @classmethod
+    def from_result(cls, result, source: str = "") -> "OCRPayload":
+        """Copies the text, scores and box corners out of an engine result.
+
+        Engine results hold the decoded image (and visualization helpers),
+        so converting right away lets those be freed with the result.
+        """
+        boxes = getattr(result, "boxes", None)
+        boxes = [] if boxes is None else [
+            [[round(float(x), 1), round(float(y), 1)] for x, y in box]
+            for box in boxes
+        ]
+        return cls(
+            boxes=boxes,
+            txts=tuple(getattr(result, "txts", None) or ()),
+            scores=tuple(float(s) for s in getattr(result, "scores", None) or ()),
+            source=source,
+        )
+
+    def to_dict(self) -> Dict:
+        return {"source": self.source, "boxes": self.boxes,
+                "txts": list(self.txts), "scores": list(self.scores)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "OCRPayload":
+        return cls(boxes=data["boxes"], txts=tuple(data["txts"]),
+                   scores=tuple(data["scores"]), source=data.get("source", ""))
+
+
+def _record_key(record: IDCardRecord) -> str:
+    # Record IDs alone are not unique in the table (the hot folder numbers
+    # its records separately), so entries are keyed by ID and source images.
+    return f"{record.record_id}|{';'.join(record.source_images)}"
+
+
+class RawOCRStore:
+    """Keeps the raw OCR payloads of a run on disk, addressed by record.
+
+    Entries are keyed by record ID and source images, so a store never
+    returns the payloads of another record that happens to share an ID.
+    Payloads are appended to one file as zlib-compressed JSON; only the
+    offsets stay in memory, so memory use does not grow with the text of
+    each record. Safe to use from several worker threads.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self._owns_file = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="idcard_raw_", suffix=".bin")
+            os.close(fd)
+        self.path = path
+        self._file = open(path, "w+b")
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, record: IDCardRecord, payloads: List[OCRPayload]) -> None:
+        """Stores the payloads of a record, replacing any earlier entry."""
+        data = json.dumps(
+            [payload.to_dict() for payload in payloads], ensure_ascii=False
+        ).encode("utf-8")
+        blob = zlib.compress(data, 6)
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            self._file.write(blob)
+            self._index[_record_key(record)] = (offset, len(blob))
+
+    def get(self, record: IDCardRecord) -> Optional[List[OCRPayload]]:
+        """Loads a record's payloads, or returns None if none were stored."""
+        with self._lock:
+            location = self._index.get(_record_key(record))
+            if location is None:
+                return None
+            offset, length = location
+            self._file.flush()
+            self._file.seek(offset)
+            blob = self._file.read(length)
+        data = json.loads(zlib.decompress(blob).decode("utf-8"))
+        return [OCRPayload.from_dict(item) for item in data]
+
+    def __contains__(self, record: IDCardRecord) -> bool:
+        return _record_key(record) in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def close(self) -> None:
+        """Closes the store; a temporary store's file is deleted."""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.close()
+            if self._owns_file:
+                try:
+                    os.remove(self.path)
+                except OSError as e:
+                    logging.warning(f"Could not remove {self.path}: {e}")
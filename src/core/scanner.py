@@ -0,0 +1,112 @@
+import logging
+import os
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from src.core.documents import DOCUMENT_EXTENSIONS
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif')
+INPUT_EXTENSIONS = IMAGE_EXTENSIONS + DOCUMENT_EXTENSIONS
+
+# Leading bytes of each supported file type.
+_MAGIC_SIGNATURES: List[Tuple[bytes, str]] = [
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+    (b'BM', 'bmp'),
+    (b'II*\x00', 'tiff'),
+    (b'MM\x00*', 'tiff'),
+    (b'%PDF-', 'pdf'),
+]
+_MAGIC_READ_SIZE = 16
+
+
+@dataclass
+class ScanOptions:
+    """Filters applied while scanning directories for input files."""
+    extensions: Tuple[str, ...] = INPUT_EXTENSIONS
+    min_size: int = 1
+    max_size: Optional[int] = None
+    check_magic: bool = True
+    recursive: bool = True
+    batch_size: int = 2000
+
+
+def detect_file_type(path: str) -> Optional[str]:
+    """Identifies a file's type from its leading bytes, or None if unknown."""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(_MAGIC_READ_SIZE)
+    except OSError:
+        return None
+    for signature, file_type in _MAGIC_SIGNATURES:
+        if header.startswith(signature):
+            return file_type
+    return None
+
+
+def walk_files(
+    root: str, extensions: Tuple[str, ...], recursive: bool = True
+) -> Iterator[os.DirEntry]:
+    """Yields file entries under ``root`` whose names end with ``extensions``.
+
+    Uses an explicit stack with ``os.scandir`` so deep trees do not recurse and
+    the stat information cached on each DirEntry can be reused by callers.
+    """
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                stack.append(entry.path)
+                        elif entry.name.lower().endswith(extensions):
+                            yield entry
+                    except OSError:
+                        continue
+        except OSError as e:
+            logging.warning(f"Cannot scan {current}: {e}")
+
+
+def _accept(entry: os.DirEntry, options: ScanOptions) -> bool:
+    try:
+        size = entry.stat().st_size
+    except OSError:
+        return False
+    if size < options.min_size:
+        return False
+    if options.max_size is not None and size > options.max_size:
+        return False
+    return not options.check_magic or detect_file_type(entry.path) is not None
+
+
+def scan_directories(
+    roots: Iterable[str],
+    options: Optional[ScanOptions] = None,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> Iterator[List[str]]:
+    """Scans directories and yields accepted file paths in batches.
+
+    Paths are deduplicated across roots (overlapping roots are allowed).
+    """
+    options = options or ScanOptions()
+    seen = set()
+    batch = []
+    for root in roots:
+        for entry in walk_files(root, options.extensions, options.recursive):
+            if should_stop():
+                return
+            path = os.path.normpath(entry.path)
+            if path in seen or not _accept(entry, options):
+                continue
+            seen.add(path)
+            batch.append(path)
+            if len(batch) >= options.batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,267 @@
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from src.core.models import IDCardRecord, ImageGroup
+from src.core.ocr import set_engine_pool_size
+from src.core.pipeline import TierStats, process_group
+
+# Priority lanes, highest priority first. Interactive jobs are a handful of
+# cards an operator is waiting for; bulk jobs are whole folders.
+LANE_INTERACTIVE = "interactive"
+LANE_BULK = "bulk"
+LANES = (LANE_INTERACTIVE, LANE_BULK)
+
+# Job states.
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+
+
+@dataclass
+class ScheduledJob:
+    """A list of image groups submitted to a JobScheduler.
+
+    Record IDs run from ``first_record_id`` in group order. Callbacks are
+    invoked from the scheduler's threads.
+    """
+    job_id: int
+    lane: str
+    groups: List[ImageGroup]
+    first_record_id: int = 1
+    options: Dict = field(default_factory=dict)  # passed on to process_group
+    on_start: Callable[[ImageGroup], None] = lambda group: None
+    # (job, index, group, record, status, error_msg) for each finished group
+    on_result: Callable = lambda *args: None
+    state: str = QUEUED
+    completed: int = 0
+    records: List[IDCardRecord] = field(default_factory=list)
+    stats: TierStats = field(default_factory=TierStats)
+    submitted_at: float = field(default_factory=time.monotonic)
+    first_result_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    _next_index: int = 0
+    _running: int = 0
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def total(self) -> int:
+        return len(self.groups)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.state == CANCELLED
+
+    def percent(self) -> int:
+        return int(self.completed * 100 / self.total) if self.total else 100
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until every group has finished or the job was cancelled."""
+        return self._done.wait(timeout)
+
+
+class JobScheduler:
+    """Runs OCR jobs from several priority lanes on one set of threads.
+
+    Each lane has its own concurrency limit and one thread per slot, so an
+    interactive job never waits for a free thread. Preemption happens between
+    groups: while interactive work is queued or running, the bulk lane starts
+    at most ``bulk_workers_when_busy`` new groups, so the cores go to the
+    interactive groups once the bulk groups in flight have finished. Within a
+    lane, jobs run in submission order.
+    """
+
+    def __init__(
+        self,
+        bulk_workers: int = 1,
+        interactive_workers: int = 1,
+        bulk_workers_when_busy: int = 0,
+    ):
+        self.limits = {
+            LANE_INTERACTIVE: max(1, interactive_workers),
+            LANE_BULK: max(1, bulk_workers),
+        }
+        self.bulk_workers_when_busy = bulk_workers_when_busy
+        self._jobs: Dict[str, List[ScheduledJob]] = {lane: [] for lane in LANES}
+        self._running: Dict[str, int] = {lane: 0 for lane in LANES}
+        self._job_ids = itertools.count(1)
+        self._next_record_id = 1
+        self._condition = threading.Condition()
+        self._shutdown = False
+
+        slots = sum(self.limits.values())
+        # Every slot can hold an engine, so a lane never waits on the pool.
+        set_engine_pool_size(slots)
+        self._threads = [
+            threading.Thread(
+                target=self._work, name=f"ocr-scheduler-{i}", daemon=True
+            )
+            for i in range(slots)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(
+        self,
+        groups: List[ImageGroup],
+        lane: str = LANE_BULK,
+        on_start: Callable[[ImageGroup], None] = lambda group: None,
+        on_result: Callable = lambda *args: None,
+        **options,
+    ) -> ScheduledJob:
+        """Queues ``groups`` as one job; ``options`` go to process_group.
+
+        Record IDs continue from the previous job, so the records of all
+        jobs since the last ``reset_record_ids`` are unique.
+        """
+        if lane not in LANES:
+            raise ValueError(f"Unknown lane: {lane}")
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Scheduler has been shut down")
+            job = ScheduledJob(
+                job_id=next(self._job_ids), lane=lane, groups=list(groups),
+                first_record_id=self._next_record_id, options=options,
+                on_start=on_start, on_result=on_result,
+            )
+            self._next_record_id += job.total
+            if not job.groups:
+                self._finish(job, DONE)
+                return job
+            self._jobs[lane].append(job)
+            self._condition.notify_all()
+        logging.info(f"Queued {lane} job {job.job_id} with {job.total} groups.")
+        return job
+
+    def reset_record_ids(self) -> None:
+        """Starts record IDs at 1 again for the next job."""
+        with self._condition:
+            self._next_record_id = 1
+
+    def cancel(self, job: ScheduledJob) -> None:
+        """Stops a job: queued groups are dropped, running ones stop early."""
+        with self._condition:
+            if job.state in (DONE, CANCELLED):
+                return
+            job.state = CANCELLED
+            if job in self._jobs[job.lane]:
+                self._jobs[job.lane].remove(job)
+            if not job._running:
+                self._finish(job, CANCELLED)
+            self._condition.notify_all()
+
+    def cancel_all(self) -> None:
+        with self._condition:
+            jobs = [job for lane in LANES for job in self._jobs[lane]]
+        for job in jobs:
+            self.cancel(job)
+
+    def jobs(self) -> List[ScheduledJob]:
+        """Jobs still queued or running, highest priority lane first."""
+        with self._condition:
+            return [job for lane in LANES for job in self._jobs[lane]]
+
+    def idle(self) -> bool:
+        with self._condition:
+            return not any(self._jobs.values()) and not any(self._running.values())
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cancels all jobs and stops the threads."""
+        self.cancel_all()
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _limit(self, lane: str) -> int:
+        if lane == LANE_BULK and (
+            self._jobs[LANE_INTERACTIVE] or self._running[LANE_INTERACTIVE]
+        ):
+            return self.bulk_workers_when_busy
+        return self.limits[lane]
+
+    def _next_task(self):
+        """Picks (job, index) from the highest lane with a free slot.
+
+        Called with the condition held; returns None if nothing may start.
+        """
+        for lane in LANES:
+            if self._running[lane] >= self._limit(lane):
+                continue
+            for job in self._jobs[lane]:
+                if job._next_index < job.total:
+                    index = job._next_index
+                    job._next_index += 1
+                    job._running += 1
+                    job.state = RUNNING
+                    self._running[lane] += 1
+                    return job, index
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                task = self._next_task()
+                while task is None:
+                    if self._shutdown:
+                        return
+                    self._condition.wait()
+                    task = self._next_task()
+            job, index = task
+            try:
+                self._run_group(job, index)
+            finally:
+                with self._condition:
+                    self._running[job.lane] -= 1
+                    job._running -= 1
+                    if not job._running and (
+                        job.cancelled or job.completed == job.total
+                    ):
+                        if job in self._jobs[job.lane]:
+                            self._jobs[job.lane].remove(job)
+                        self._finish(job, CANCELLED if job.cancelled else DONE)
+                    self._condition.notify_all()
+
+    def _run_group(self, job: ScheduledJob, index: int) -> None:
+        group = job.groups[index]
+        if job.cancelled:
+            return
+        job.on_start(group)
+        try:
+            record, status, error_msg = process_group(
+                group, str(job.first_record_id + index),
+                lambda: job.cancelled, job.stats, **job.options,
+            )
+        except Exception as e:
+            logging.error(f"Job {job.job_id}: group {group.group_id} failed: {e}",
+                          exc_info=True)
+            record = IDCardRecord(
+                record_id=str(job.first_record_id + index),
+                source_images=group.image_paths, status="FAILED",
+                raw_ocr_output=str(e),
+            )
+            status, error_msg = "FAILED", str(e)
+        if record is None:
+            return  # Cancelled while running
+        with self._condition:
+            job.records.append(record)
+            job.completed += 1
+            if job.first_result_at is None:
+                job.first_result_at = time.monotonic()
+        job.on_result(job, index, group, record, status, error_msg)
+
+    def _finish(self, job: ScheduledJob, state: str) -> None:
+        job.state = state
+        job.finished_at = time.monotonic()
+        job._done.set()
+        logging.info(
+            f"{job.lane.capitalize()} job {job.job_id} {state}: "
+            f"{job.completed}/{job.total} groups in "
+            f"{job.finished_at - job.submitted_at:.1f}s."
+        )
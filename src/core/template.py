@@ -0,0 +1,127 @@
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.card_detection import (
+    CARD_HEIGHT,
+    CARD_WIDTH,
+    locate_card,
+    rectify_card,
+)
+
+# Minimum CardLocation.fit for the template to be trusted.
+MIN_TEMPLATE_FIT = 0.7
+# Recognized crops below this score are treated as empty.
+MIN_FIELD_SCORE = 0.5
+
+# Value regions on a rectified card, as (x0, y0, x1, y1) fractions of the card
+# size. Labels are not cropped; each field is emitted with its keyword prefix
+# so extract_info can parse template output like a full-detection result.
+# Multi-line fields (the address) are split into one crop per text line.
+FRONT_FIELDS: List[Tuple[str, str, Tuple[float, float, float, float]]] = [
+    ("name", "姓名", (0.17, 0.08, 0.60, 0.20)),
+    ("gender", "性别", (0.17, 0.20, 0.29, 0.31)),
+    ("ethnicity", "民族", (0.40, 0.20, 0.60, 0.31)),
+    ("birth", "出生", (0.17, 0.32, 0.62, 0.44)),
+    ("address", "住址", (0.17, 0.46, 0.63, 0.56)),
+    ("address", "", (0.17, 0.555, 0.63, 0.655)),
+    ("address", "", (0.17, 0.65, 0.63, 0.75)),
+    ("id_number", "公民身份号码", (0.33, 0.78, 0.95, 0.92)),
+]
+BACK_FIELDS: List[Tuple[str, str, Tuple[float, float, float, float]]] = [
+    ("issuing_authority", "签发机关", (0.38, 0.68, 0.93, 0.80)),
+    ("validity_period", "有效期限", (0.38, 0.80, 0.93, 0.92)),
+]
+
+_ID_PATTERN = re.compile(r"\d{17}[\dXx]")
+
+# Recognizes a single cropped text line: returns (text, score).
+Recognizer = Callable[[np.ndarray], Tuple[str, float]]
+
+
+@dataclass
+class TemplateOCROutput:
+    """OCR output built from template crops; mirrors the RapidOCROutput fields
+    read by extract_info (boxes, txts, scores)."""
+    boxes: List[np.ndarray] = field(default_factory=list)
+    txts: Tuple[str, ...] = ()
+    scores: Tuple[float, ...] = ()
+
+    def __len__(self):
+        return len(self.txts)
+
+
+def _crop(card: np.ndarray, region: Tuple[float, float, float, float]):
+    x0, y0, x1, y1 = region
+    box = np.array([
+        [x0 * CARD_WIDTH, y0 * CARD_HEIGHT], [x1 * CARD_WIDTH, y0 * CARD_HEIGHT],
+        [x1 * CARD_WIDTH, y1 * CARD_HEIGHT], [x0 * CARD_WIDTH, y1 * CARD_HEIGHT],
+    ], dtype=np.float32)
+    crop = card[int(box[0][1]):int(box[2][1]), int(box[0][0]):int(box[2][0])]
+    return crop, box
+
+
+def _read_fields(card: np.ndarray, fields, recognize: Recognizer) -> Dict[str, list]:
+    """Recognizes each field region; returns field -> [(label, text, score, box)]."""
+    values: Dict[str, list] = {}
+    for key, label, region in fields:
+        crop, box = _crop(card, region)
+        text, score = recognize(crop)
+        text = text.strip() if text else ""
+        if text and score >= MIN_FIELD_SCORE:
+            values.setdefault(key, []).append((label, text, score, box))
+    return values
+
+
+def _to_output(values: Dict[str, list], fields) -> TemplateOCROutput:
+    boxes, txts, scores = [], [], []
+    seen = set()
+    for key, _, _ in fields:
+        if key in seen or key not in values:
+            continue
+        seen.add(key)
+        parts = values[key]
+        # Multi-line fields become one keyword line followed by continuations,
+        # which extract_info's greedy matching joins back together.
+        for label, text, score, box in parts:
+            boxes.append(box)
+            txts.append(f"{label}{text}")
+            scores.append(score)
+    return TemplateOCROutput(boxes=boxes, txts=tuple(txts), scores=tuple(scores))
+
+
+def ocr_card_template(
+    image: np.ndarray, recognize: Recognizer
+) -> Optional[TemplateOCROutput]:
+    """Runs recognition-only OCR on the known field regions of an ID card.
+
+    Returns None when the card cannot be located with a good template fit or
+    when neither the front nor the back anchor field reads plausibly; callers
+    should then fall back to full-image detection.
+    """
+    location = locate_card(image)
+    if location is None or location.fit < MIN_TEMPLATE_FIT:
+        logging.debug("Template fit too poor, falling back to full detection.")
+        return None
+    card = rectify_card(image, location.quad)
+
+    # The ID number anchors the front side; the validity period the back.
+    front_anchor = _read_fields(card, FRONT_FIELDS[-1:], recognize)
+    anchor_text = "".join(t for _, t, _, _ in front_anchor.get("id_number", []))
+    if _ID_PATTERN.search(anchor_text.replace(" ", "")):
+        values = _read_fields(card, FRONT_FIELDS[:-1], recognize)
+        values.update(front_anchor)
+        return _to_output(values, FRONT_FIELDS)
+
+    back_anchor = _read_fields(card, BACK_FIELDS[-1:], recognize)
+    anchor_text = "".join(t for _, t, _, _ in back_anchor.get("validity_period", []))
+    if len(re.sub(r"\D", "", anchor_text)) >= 8:
+        values = _read_fields(card, BACK_FIELDS[:-1], recognize)
+        values.update(back_anchor)
+        return _to_output(values, BACK_FIELDS)
+
+    logging.debug("Template anchors not recognized, falling back to full detection.")
+    return None
@@ -1,17 +1,158 @@
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+# Mojibake is text whose bytes were decoded with the wrong codec. Here that
+# is Chinese GBK/GB18030 bytes decoded as Latin-1, or UTF-8 bytes decoded as
+# cp1252. Either way every character of the result is in the Latin-1 range
+# or is one of cp1252's extra characters in 0x80-0x9F.
+
+# cp1252 characters for bytes 0x80-0x9F, mapped back to those bytes.
+# Bytes cp1252 leaves undefined (0x81, 0x8D, ...) keep their Latin-1 meaning.
+_CP1252_TO_BYTE: Dict[int, int] = {}
+for _byte in range(0x80, 0xA0):
+    try:
+        _CP1252_TO_BYTE[ord(bytes([_byte]).decode('cp1252'))] = _byte
+    except UnicodeDecodeError:
+        pass
+_CP1252_EXTRA = "".join(chr(c) for c in _CP1252_TO_BYTE)
+
+# Any character outside this set means the line cannot be mojibake of
+# either kind. Clean Chinese lines fail on their first ideograph.
+_NOT_MOJIBAKE = re.compile(f"[^\\x00-\\xff{re.escape(_CP1252_EXTRA)}]")
+_HIGH_CHAR = re.compile(f"[\\x80-\\xff{re.escape(_CP1252_EXTRA)}]")
+_ASCII_LETTER = re.compile("[A-Za-z]")
+# A UTF-8 lead byte (as Latin-1/cp1252) followed by a continuation byte.
+_UTF8_SEQUENCE = re.compile(f"[\\xc2-\\xf4][\\x80-\\xbf{re.escape(_CP1252_EXTRA)}]")
+_CJK = re.compile("[㐀-鿿豈-﫿\U00020000-\U0002ffff]")
+
+# Repairs tried on a candidate line, in order. UTF-8 is strict enough that
+# a successful decode is a strong signal, so it goes first.
+REPAIR_CODECS = ("utf-8", "gbk", "gb18030")
+
+
+@dataclass
+class RepairStats:
+    """Counts how many lines were checked, tried and repaired (per codec)."""
+    lines: int = 0
+    candidates: int = 0  # lines whose codepoint profile looked like mojibake
+    repaired: Dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    @property
+    def rejected(self) -> int:
+        """Candidates that no codec turned into plausible Chinese text."""
+        return self.candidates - sum(self.repaired.values())
+
+    def merge(self, other: "RepairStats") -> None:
+        """Adds another stats object; safe to call from several threads."""
+        with self._lock:
+            self.lines += other.lines
+            self.candidates += other.candidates
+            for codec, count in other.repaired.items():
+                self.repaired[codec] = self.repaired.get(codec, 0) + count
+
+    def snapshot(self) -> "RepairStats":
+        """A copy of the current counts, for ``restore``."""
+        with self._lock:
+            return RepairStats(self.lines, self.candidates, dict(self.repaired))
+
+    def restore(self, snapshot: "RepairStats") -> None:
+        """Resets the counts to an earlier ``snapshot``."""
+        with self._lock:
+            self.lines = snapshot.lines
+            self.candidates = snapshot.candidates
+            self.repaired = dict(snapshot.repaired)
+
+    def summary(self) -> str:
+        repaired = ", ".join(
+            f"{count} {codec}" for codec, count in sorted(self.repaired.items())
+        ) or "none"
+        return (
+            f"{self.lines} lines, {self.candidates} looked garbled; "
+            f"repaired: {repaired}; left unchanged: {self.rejected}."
+        )
+
+
+# Totals over every extract_info call of this process.
+repair_stats = RepairStats()
+
+
+def looks_garbled(text: str) -> bool:
+    """Cheap pre-check: could ``text`` be GBK or UTF-8 mojibake at all?
+
+    Needs every character in the Latin-1/cp1252 range, at least two non-ASCII
+    characters (each Chinese character becomes two or three), and more of
+    those than ASCII letters, so Latin words such as "Müller" are left alone.
+    """
+    if text.isascii() or _NOT_MOJIBAKE.search(text):
+        return False
+    high = len(_HIGH_CHAR.findall(text))
+    return high >= 2 and high > len(_ASCII_LETTER.findall(text))
+
+
+def _to_bytes(text: str) -> bytes:
+    return text.translate(_CP1252_TO_BYTE).encode('latin-1')
+
+
+def _repair(text: str, stats: RepairStats) -> str:
+    """Decodes a line that passed ``looks_garbled`` with the first codec
+    that yields Chinese characters."""
+    stats.candidates += 1
+    raw = _to_bytes(text)
+    for codec in REPAIR_CODECS:
+        if codec == "utf-8" and not _UTF8_SEQUENCE.search(text):
+            continue
+        try:
+            repaired = raw.decode(codec)
+        except UnicodeDecodeError:
+            continue
+        if _CJK.search(repaired):
+            stats.repaired[codec] = stats.repaired.get(codec, 0) + 1
+            return repaired
+    return text
+
+
+def repair_text(text: str, stats: Optional[RepairStats] = None) -> str:
+    """Returns ``text`` with GBK/GB18030 or UTF-8-as-cp1252 mojibake undone.
+
+    Only lines passing ``looks_garbled`` are decoded, and a repair is kept
+    only if it produces Chinese characters; anything else is returned as is.
+    """
+    local = RepairStats(lines=1)
+    if looks_garbled(text):
+        text = _repair(text, local)
+    if stats is not None:
+        stats.merge(local)
+    return text
+
+
+def fix_lines(lines: Iterable[str], stats: Optional[RepairStats] = None) -> List[str]:
+    """Repairs a batch of OCR lines; counts go to ``stats`` in one update."""
+    local = RepairStats()
+    fixed = []
+    for line in lines:
+        # The first test of looks_garbled, inlined: clean lines never leave C.
+        if not line or line.isascii() or _NOT_MOJIBAKE.search(line):
+            fixed.append(line)
+        elif looks_garbled(line):
+            fixed.append(_repair(line, local))
+        else:
+            fixed.append(line)
+    local.lines = len(fixed)
+    if stats is not None:
+        stats.merge(local)
+    return fixed
+
 
 def fix_garbled_text(text: str) -> str:
     """
     Attempts to fix garbled Chinese text that occurs from encoding mismatches.
     This commonly happens when a string is decoded using the wrong codec.
-    This function tries to reverse the process and decode with a more appropriate one.
+    Clean text (the usual case) is recognized by a pre-check and returned
+    without any codec round-trip; see ``repair_text``.
     """
-    try:
-        # The mojibake pattern often involves latin-1 or cp1252 decoding
-        # of GBK/UTF-8 bytes.
-        # We encode it back to bytes and then decode with a common Chinese encoding.
-        return text.encode('latin-1').decode('gbk')
-    except (UnicodeEncodeError, UnicodeDecodeError):
-        # If any error occurs, it means our assumption was wrong,
-        # and the text was likely not garbled in this specific way.
-        return text
-
+    return repair_text(text)
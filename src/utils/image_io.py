@@ -0,0 +1,19 @@
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+def read_image(image_path: str) -> Optional[np.ndarray]:
+    """Reads an image file into a BGR array.
+
+    Uses ``np.fromfile`` + ``cv2.imdecode`` instead of ``cv2.imread`` so that
+    paths containing non-ASCII characters work on Windows.
+    """
+    try:
+        data = np.fromfile(image_path, dtype=np.uint8)
+    except OSError:
+        return None
+    if data.size == 0:
+        return None
+    return cv2.imdecode(data, cv2.IMREAD_COLOR)
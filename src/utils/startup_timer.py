@@ -0,0 +1,35 @@
+import json
+import logging
+import os
+import time
+from typing import Dict
+
+# Environment variables used by scripts/measure_startup.py.
+REPORT_ENV = "IDCARD_STARTUP_REPORT"  # JSON file the marks are written to
+IMAGE_ENV = "IDCARD_STARTUP_IMAGE"  # image to recognize right after startup
+
+_start = time.perf_counter()
+_marks: Dict[str, Dict[str, float]] = {}
+
+
+def mark(name: str) -> None:
+    """Records a startup milestone (first occurrence only).
+
+    Each mark stores the seconds elapsed since this module was imported and
+    the wall-clock time, so an external launcher can also include interpreter
+    and bundle start-up time.
+    """
+    if name in _marks:
+        return
+    elapsed = time.perf_counter() - _start
+    _marks[name] = {"elapsed": elapsed, "wall": time.time()}
+    logging.info(f"Startup: {name} after {elapsed:.3f}s")
+
+    report_path = os.environ.get(REPORT_ENV)
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(_marks, f)
+
+
+def has_mark(name: str) -> bool:
+    return name in _marks
@@ -0,0 +1,67 @@
+import json
+import os
+import shutil
+from dataclasses import replace
+
+from src.core.evaluation import (
+    CorpusResult,
+    load_corpus,
+    regression_check,
+    replay_corpus,
+)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data', 'regression')
+CORPUS = os.path.join(DATA_DIR, 'corpus.jsonl')
+BASELINE = os.path.join(DATA_DIR, 'replay_baseline.json')
+
+
+def load_baseline() -> CorpusResult:
+    with open(BASELINE, encoding='utf-8') as f:
+        return CorpusResult.from_dict(json.load(f))
+
+
+def test_replay_matches_baseline():
+    baseline = load_baseline()
+    result = replay_corpus(load_corpus(CORPUS))
+
+    assert result.samples == baseline.samples
+    assert result.statuses == baseline.statuses
+    # The stored records/s come from another machine, so only accuracy is
+    # checked against the file.
+    passed, report = regression_check(baseline, result, max_slowdown=None)
+    assert passed, report
+
+
+def test_replay_throughput_is_stable():
+    # Median timing keeps two runs of a millisecond-scale replay comparable.
+    samples = load_corpus(CORPUS)
+    first = replay_corpus(samples)
+    second = replay_corpus(samples)
+
+    passed, report = regression_check(first, second, max_slowdown=0.5)
+    assert passed, report
+
+
+def test_regression_check_flags_accuracy_drop(tmp_path):
+    shutil.copytree(DATA_DIR, tmp_path, dirs_exist_ok=True)
+    fixture = tmp_path / 'fixtures' / 'A.json'
+    payloads = json.loads(fixture.read_text(encoding='utf-8'))
+    payloads[0]['txts'][0] = '姓名张伟伟'
+    fixture.write_text(json.dumps(payloads, ensure_ascii=False), encoding='utf-8')
+
+    result = replay_corpus(load_corpus(str(tmp_path / 'corpus.jsonl')))
+    passed, report = regression_check(load_baseline(), result, max_slowdown=None)
+
+    assert not passed
+    assert any(line.startswith('name recall') and 'FAIL' in line for line in report)
+
+
+def test_regression_check_flags_slowdown():
+    baseline = load_baseline()
+    slower = replace(baseline, seconds=baseline.seconds * 2)
+
+    passed, report = regression_check(baseline, slower)
+
+    assert not passed
+    assert 'FAIL' in report[-1]
+    assert regression_check(baseline, slower, max_slowdown=None)[0]